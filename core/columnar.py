@@ -0,0 +1,208 @@
+# core/columnar.py
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+from core.record import Codebook, DAY_TYPES, LEAVE_TYPES, OvertimeRecord
+
+# NumPy 为可选依赖：未安装时 DataManager.get_columnar() 返回 None，统计走逐条计算
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def month_range(month: str) -> Tuple[int, int]:
+    """月份前缀（YYYY 或 YYYY-MM）对应的日期序数区间 [start, end)"""
+    year = int(month[:4])
+    if len(month) >= 7:
+        mon = int(month[5:7])
+        start = date(year, mon, 1)
+        end = date(year + mon // 12, mon % 12 + 1, 1)
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    return start.toordinal(), end.toordinal()
+
+
+class ColumnarTable:
+    """列式记录表：每个字段一个NumPy数组，随记录写入增量追加
+
+    日期序数 int32、用户/类型/请假类型为字典编码、时长 float64（与逐条计算的 float 相同）、工资 int64（分）。
+    删除只标记 alive=False，修改原位覆盖；格式不规范的日期序数为0，不会被日期条件选中。
+    时长原文与 "%g" 格式不同的（如"2.0"）另存原文，明细中按原文显示。
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        capacity = max(capacity, 1)
+        self._lock = threading.RLock()
+        self._size = 0
+        self._row_of = {}  # 记录ID -> 行号
+        self._hours_text = {}  # 行号 -> 时长原文（仅与 "%g" 格式不同的行）
+        self.users = Codebook([])
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.ordinal = np.zeros(capacity, dtype=np.int32)
+        self.user = np.zeros(capacity, dtype=np.int32)
+        self.type = np.zeros(capacity, dtype=np.int16)
+        self.leave = np.zeros(capacity, dtype=np.int16)
+        self.hours = np.zeros(capacity, dtype=np.float64)
+        self.salary_cents = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    _COLUMNS = ("ids", "ordinal", "user", "type", "leave", "hours", "salary_cents", "alive")
+
+    @classmethod
+    def from_items(cls, items: List[Tuple[int, List[str]]]) -> "ColumnarTable":
+        table = cls(len(items) or cls.INITIAL_CAPACITY)
+        table.append(items)
+        return table
+
+    def _reserve(self, needed: int):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _set_row(self, row: int, record_id: int, record: OvertimeRecord):
+        self.ids[row] = record_id
+        self.ordinal[row] = record.ordinal
+        self.user[row] = self.users.code(record.user)
+        self.type[row] = record.type_code
+        self.leave[row] = record.leave_code
+        self.hours[row] = record.hours
+        text = record[3]
+        if text != "%g" % record.hours:
+            self._hours_text[row] = text
+        else:
+            self._hours_text.pop(row, None)
+        self.salary_cents[row] = record.salary_cents
+        self.alive[row] = True
+
+    def append(self, items: Iterable[Tuple[int, List[str]]]):
+        """追加 (记录ID, 记录)；已存在的ID视为修改"""
+        items = list(items)
+        with self._lock:
+            self._reserve(self._size + len(items))
+            for record_id, record in items:
+                record = OvertimeRecord.from_row(record)
+                row = self._row_of.get(record_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row_of[record_id] = row
+                self._set_row(row, record_id, record)
+
+    def update(self, record_id: int, record):
+        self.append([(record_id, record)])
+
+    def delete(self, record_id: int):
+        with self._lock:
+            row = self._row_of.pop(record_id, None)
+            if row is not None:
+                self.alive[row] = False
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def select(self, month: str = None, date_start: str = None, date_end: str = None,
+               user: str = None, day_type: str = None) -> "ColumnarSelection":
+        """按条件选出行（向量化比较），返回列的快照"""
+        with self._lock:
+            n = self._size
+            mask = self.alive[:n].copy()
+            ordinal = self.ordinal[:n]
+            if month:
+                start, end = month_range(month)
+                mask &= (ordinal >= start) & (ordinal < end)
+            if date_start:
+                mask &= ordinal >= date.fromisoformat(date_start).toordinal()
+            if date_end:
+                mask &= (ordinal > 0) & (ordinal <= date.fromisoformat(date_end).toordinal())
+            if user is not None:
+                code = self.users.find(user)
+                if code is None:
+                    mask[:] = False
+                else:
+                    mask &= self.user[:n] == code
+            if day_type is not None:
+                code = DAY_TYPES.find(day_type)
+                if code is None:
+                    mask[:] = False
+                else:
+                    mask &= self.type[:n] == code
+
+            rows = np.flatnonzero(mask)
+            hours_text = {int(self.ids[row]): text for row, text in self._hours_text.items() if mask[row]}
+            return ColumnarSelection(
+                users=list(self.users.names), hours_text=hours_text,
+                ids=self.ids[rows], ordinal=ordinal[rows], user=self.user[rows],
+                type=self.type[rows], leave=self.leave[rows],
+                hours=self.hours[rows], salary_cents=self.salary_cents[rows],
+            )
+
+
+class ColumnarSelection:
+    """选中行的列快照，提供汇总、倍率计算和分组统计"""
+
+    def __init__(self, users: List[str], hours_text: Dict[int, str] = None, **columns):
+        self.users = users
+        self._hours_text = hours_text or {}
+        self.ids = columns["ids"]
+        self.ordinal = columns["ordinal"]
+        self.user = columns["user"]
+        self.type = columns["type"]
+        self.leave = columns["leave"]
+        self.hours = columns["hours"]
+        self.salary_cents = columns["salary_cents"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def hours_label(self, index: int) -> str:
+        """第 index 行的时长文本，与记录中的原文一致"""
+        text = self._hours_text.get(int(self.ids[index]))
+        return text if text is not None else "%g" % self.hours[index]
+
+    def summary_by_type(self) -> Dict[str, Dict[str, float]]:
+        """按日期类型汇总时长和条数（请假记录单独计入"请假"）
+
+        bincount 按行顺序逐个累加，结果与逐条计算完全一致；请假记录归入最后一个分组。
+        """
+        is_leave = self.leave != 0
+        size = len(DAY_TYPES.names)
+        groups = np.where(is_leave, size, self.type)
+        weights = np.where(is_leave, np.abs(self.hours), self.hours)
+        hours_by_group = np.bincount(groups, weights=weights, minlength=size + 1)
+        count_by_group = np.bincount(groups, minlength=size + 1)
+
+        summary = {}
+        for day_type in ("工作日", "休息日", "节假日", "调休日"):
+            code = DAY_TYPES.code(day_type)
+            summary[day_type] = {'hours': float(hours_by_group[code]),
+                                 'count': int(count_by_group[code])}
+        summary['请假'] = {'hours': float(hours_by_group[size]), 'count': int(count_by_group[size])}
+        return summary
+
+    def counted(self, deduct_types: List[str]):
+        """计算加班工资的行（布尔数组）：非请假或扣除类请假，且时长大于0，与逐条计算的条件一致"""
+        deduct_codes = [LEAVE_TYPES.code(t) for t in deduct_types]
+        return ((self.leave == 0) | np.isin(self.leave, deduct_codes)) & (self.hours > 0)
+
+    def salary_amounts(self, rates: Dict[str, float], hourly_wage: float, counted):
+        """按日期类型倍率计算每行加班工资（元），counted 之外的行为0"""
+        rate_codes = {DAY_TYPES.code(day_type): rate for day_type, rate in rates.items()}
+        rate_by_type = np.zeros(len(DAY_TYPES.names), dtype=np.float64)
+        for code, rate in rate_codes.items():
+            rate_by_type[code] = rate
+        return np.where(counted, hourly_wage * self.hours * rate_by_type[self.type], 0.0)
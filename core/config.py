@@ -12,6 +12,12 @@ class ConfigManager:
         'default_hours': '8',
         'page_size': 10,
         'web_port': 8080,
+        'storage_engine': 'csv',  # csv, sqlite, partitioned
+        'group_commit_ms': 5,  # 并发写入合并窗口（毫秒），0 表示关闭
+        'read_mode': 'cache',  # cache（完整加载到内存）, mmap（内存映射按需解析，适合大文件）
+        'journal': False,  # 预写日志：崩溃后启动时修复写了一半的记录
+        'fsync_policy': 'batch',  # write（每次写入）, batch（每批写入）, interval（按间隔）
+        'fsync_interval_ms': 1000,  # interval 策略的落盘间隔（毫秒）
         'leave_types': ['事假', '病假', '年假', '婚假', '产假'],
         'deduct_rest_day_hours': True,
         'overtime_pay': {
@@ -1,16 +1,40 @@
 # core/data_manager.py
+import io
 import os
 import csv
+import json
+import hashlib
 import shutil
+import threading
+from itertools import chain, islice
 from datetime import datetime
 from typing import List, Tuple, Dict, Any
+from core.utils import detect_encoding, detect_encoding_from_bytes
+from core.file_lock import FileLock
+from core.writer import GroupCommitWriter
+from core.journal import WriteAheadJournal, FSYNC_POLICIES
+from core.storage import RECORD_COLUMNS, RECORD_WIDTH, CSV_HEADER, header_has_ids, match_filters, page_slice, stored_record_id
+from core.record import OvertimeRecord
+from core.columnar import ColumnarTable, numpy_available
+from core.user_index import UserIndex, TypeIndex
+from core.date_index import DateIndex
+from core.row_index import RowIndex, encode_cursor, decode_cursor, scan_page
+from core.mapped_file import MappedRecordFile, DATE_FILTER_KEYS
+from core.exporters import WRITERS, detect_format, pyarrow_available
 
 class DataManager:
     """数据管理器"""
 
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", storage_engine="csv", group_commit_ms=0, read_mode="cache",
+                 journal=False, fsync_policy="batch", fsync_interval_ms=1000):
         self.data_dir = data_dir
         self.overtime_file = os.path.join(data_dir, "overtime_records.csv")
+        # 数据文件编码记录（编码 + 文件头部摘要），文件被替换时才重新检测
+        self.encoding_file = os.path.join(data_dir, "overtime_records.encoding.json")
+        self._encoding_info = None
+        # 跨进程写锁：追加、恢复、压缩时持有，读取不加锁
+        self.lock_file = os.path.join(data_dir, "overtime_records.lock")
+        self.file_lock = FileLock(self.lock_file)
         self.backup_dir = os.path.join(data_dir, "backup")
 
         # 确保data目录存在
@@ -23,53 +47,907 @@ class DataManager:
             os.makedirs(self.backup_dir)
             print(f"✓ 创建备份目录: {self.backup_dir}")
 
+        # 记录缓存：只解析一次，按文件 (mtime_ns, size) 判断是否失效
+        # 缓存为 {记录ID: 记录} 的有序字典，保持文件中的写入顺序
+        self._cache_lock = threading.RLock()
+        self._cache_records = None
+        self._cache_signature = None
+        # 增量读取状态：已解析到的字节偏移、文件头部字节、解析所用编码
+        self._cache_offset = 0
+        self._cache_head = b""
+        self._cache_encoding = None
+        # 已解析的数据行数（旧数据无ID列时以行号作为ID）和已分配的最大ID
+        self._cache_rows = 0
+        self._cache_max_id = 0
+        # 表头是否含记录ID列；读取ID时的下限（操作日志中压缩前已分配的最大ID）
+        self._cache_has_ids = True
+        self._cache_id_floor = 0
+        # 末尾未以换行结束的行对应的ID（下次增量读取时需先撤回）
+        self._cache_partial = []
+        # 派生索引（用户索引、列式视图等）：首次使用时构建，之后随缓存增量更新
+        self._indexes = {}
+        # 读取方式：cache（完整解析到内存缓存）/ mmap（内存映射，只建行偏移索引，按需解析，适合大文件）
+        if read_mode not in ("cache", "mmap"):
+            print(f"⚠ 未知读取方式 {read_mode}，使用 cache")
+            read_mode = "cache"
+        self.read_mode = read_mode
+        self._mapped = None
+        # mmap 方式下操作日志的快照：(签名, 墓碑, 补丁, 已分配的最大ID)
+        self._mapped_ops = None
+
+        # 删除/修改操作日志：追加写入墓碑和补丁，读取时叠加，超过阈值后后台压缩
+        self.ops_file = os.path.join(data_dir, "overtime_records.ops.csv")
+        # 日期有序索引的持久化文件，数据文件未变化时启动直接加载
+        self.date_index_file = os.path.join(data_dir, "overtime_records.dateidx.json")
+        self._ops_signature = None
+        self._ops_deleted = set()
+        self._ops_patches = {}
+        self._ops_count = 0
+        # 压缩前已分配过的最大ID，防止被删除记录的ID在压缩后被复用
+        self._ops_max_id = 0
+        self._compacting = False
+
+        # 可插拔存储引擎：csv（默认，内置实现）/ sqlite / partitioned（按月分区）
+        self.storage_engine = storage_engine
+        self.storage = None
+        if storage_engine == "sqlite":
+            from core.storage import SqliteStorage
+            self.storage = SqliteStorage(os.path.join(data_dir, "overtime_records.db"))
+            print(f"✓ 使用SQLite存储: {self.storage.db_path}")
+        elif storage_engine == "partitioned":
+            from core.storage import PartitionedStorage
+            self.storage = PartitionedStorage(os.path.join(data_dir, "records"))
+            print(f"✓ 使用按月分区存储: {self.storage.root_dir}")
+        elif storage_engine != "csv":
+            print(f"⚠ 未知存储引擎 {storage_engine}，使用CSV")
+            self.storage_engine = "csv"
+
+        # 首次启用其他存储引擎时，一次性迁移原CSV数据（保留记录ID）
+        if (self.storage is not None and os.path.exists(self.overtime_file)
+                and not self.storage.get_meta("migrated_from_csv")):
+            with self.file_lock, self._cache_lock:
+                self._refresh_csv_cache()
+                items = self._live_items()
+            self.storage.migrate_from_csv(items)
+
+        # 落盘策略：write（每次写入单独提交并fsync，不与其他写入合并）/ batch（组提交的每批fsync一次）
+        # / interval（写入时不fsync数据文件，后台按 fsync_interval_ms 间隔统一落盘）
+        # 启用预写日志时，无论哪种策略，日志条目都在写数据文件之前fsync
+        if fsync_policy not in FSYNC_POLICIES:
+            print(f"⚠ 未知落盘策略 {fsync_policy}，使用 batch")
+            fsync_policy = "batch"
+        self.fsync_policy = fsync_policy
+        self.fsync_interval_ms = fsync_interval_ms
+        self._unsynced = False
+
+        # 预写日志（CSV存储）：追加前先记录目标偏移、内容和校验和，启动时修复写了一半的追加
+        self.journal_file = os.path.join(data_dir, "overtime_records.journal")
+        self.journal = WriteAheadJournal(self.journal_file) if journal and self.storage is None else None
+        if self.storage is None and os.path.exists(self.journal_file) and os.path.getsize(self.journal_file):
+            self._recover_journal()
+
+        # 单一写入线程：GUI和Web的写入都经队列交给它；group_commit_ms 为合并窗口（0 表示不等待）
+        # write 策略每次写入单独提交（每批只取一个请求）
+        self._writer = GroupCommitWriter(
+            lambda records: self._append_records(records, sync=self.fsync_policy != "interval"),
+            window_ms=0 if self.fsync_policy == "write" else (group_commit_ms or 0),
+            max_batch=1 if self.fsync_policy == "write" else GroupCommitWriter.MAX_BATCH
+        )
+
+        # interval 策略：后台线程定时落盘
+        self._flush_stop = threading.Event()
+        self._flusher = None
+        if self.fsync_policy == "interval":
+            self._flusher = threading.Thread(target=self._flush_loop, name="RecordFlusher", daemon=True)
+            self._flusher.start()
+
+    HEAD_CHECK_SIZE = 1024
+    ENCODING_SAMPLE_SIZE = 65536
+    # 墓碑+补丁数量达到记录数的该比例（且不少于 COMPACT_MIN_OPS 条）时触发后台压缩
+    COMPACT_RATIO = 0.2
+    COMPACT_MIN_OPS = 100
+
+    def _file_signature(self, path=None):
+        """获取文件签名 (mtime_ns, size, inode)，文件不存在返回None"""
+        try:
+            stat = os.stat(path or self.overtime_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def invalidate_cache(self):
+        """丢弃记录缓存，下次读取时重新解析"""
+        with self._cache_lock:
+            self._cache_records = None
+            self._cache_signature = None
+            self._indexes = {}
+            self._cache_offset = 0
+            self._cache_head = b""
+            self._cache_encoding = None
+            self._cache_rows = 0
+            self._cache_max_id = 0
+            self._cache_has_ids = True
+            self._cache_id_floor = 0
+            self._cache_partial = []
+            self._ops_signature = None
+            self._ops_deleted = set()
+            self._ops_patches = {}
+            self._ops_count = 0
+            self._ops_max_id = 0
+
     def create_file_if_not_exists(self):
         """如果文件不存在则创建CSV文件 - 使用UTF-8-sig"""
+        if self.storage is not None:
+            print(f"ℹ 使用{self.storage_engine}存储，无需创建CSV文件")
+            return
+
         if not os.path.exists(self.overtime_file):
             # 🎯 使用 utf-8-sig 编码（带BOM，Excel可识别）
             with open(self.overtime_file, 'w', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
-                writer.writerow(["日期", "用户", "类型", "加班时长", "请假类型", "请假时长", "提交时间", "加班工资"])
+                writer.writerow(CSV_HEADER)
             print(f"✓ 创建数据文件: {self.overtime_file}")
         else:
             print(f"ℹ CSV文件已存在: {self.overtime_file}")
 
     def add_record(self, record: List[str]) -> bool:
-        """添加记录 - 使用UTF-8-sig"""
+        """添加记录 - 使用数据文件编码（默认UTF-8-sig）"""
+        return self.add_records([record])
+
+    def add_records(self, records: List[List[str]]) -> bool:
+        """批量添加记录：交给写入线程，与窗口期内的其他并发写入合并为一次写入"""
+        return self._writer.submit(list(records))
+
+    def _append_records(self, records: List[List[str]], sync=False) -> bool:
+        """追加记录：只打开一次文件，写入失败时回滚到写入前的长度；sync 时写入后 fsync"""
+        if self.storage is not None:
+            return self.storage.add_records(records, sync=sync)
+
+        # 与 csv 写出的内容一致：None 写为空串，其他值转为字符串
+        records = [["" if v is None else str(v) for v in list(r)[:RECORD_WIDTH]] for r in records if r]
+        with self.file_lock:
+            if not os.path.exists(self.overtime_file):
+                self.create_file_if_not_exists()
+
+            # 持锁刷新缓存，确保新记录ID不与其他进程已写入的记录冲突
+            with self._cache_lock:
+                # mmap 方式且缓存未加载时，由行偏移索引取最大ID，不解析整个文件
+                mapped = None
+                if self._cache_records is None:
+                    mapped = self._mapped_call({}, lambda m: (max(m.max_id(), len(m), self._mapped_ops[3]) + 1,
+                                                              m.encoding))
+                if mapped is not None:
+                    first_id, encoding = mapped
+                else:
+                    self._refresh_csv_cache()
+                    first_id = max(self._cache_max_id, self._cache_rows, self._ops_max_id) + 1
+                    encoding = self._cache_encoding or self._get_file_encoding() or 'utf-8-sig'
+            rows = [list(record) + [""] * (RECORD_WIDTH - len(record)) + [str(first_id + i)]
+                    for i, record in enumerate(records)]
+
+            signature_before = self._file_signature()
+            size_before = signature_before[1] if signature_before else 0
+            try:
+                # 🎯 沿用数据文件已有编码，新文件使用 utf-8-sig
+                payload = self._encode_rows(rows, encoding)
+                # 预写：日志条目落盘后才写数据文件，断电后残缺的数据总能按日志修复
+                if self.journal is not None:
+                    self.journal.append(size_before, payload, sync=True)
+                with open(self.overtime_file, 'ab') as f:
+                    f.write(payload)
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                if sync and self.journal is not None:
+                    self.journal.checkpoint()
+                self._unsynced = not sync
+            except Exception as e:
+                print(f"✗ 添加记录失败: {e}")
+                self._rollback_append(signature_before, size_before)
+                return False
+            signature_after = self._file_signature()
+
+        # 缓存与写入前的文件完全一致时直接追加，否则交给下次读取增量解析
+        with self._cache_lock:
+            if (self._cache_records is not None and signature_before == self._cache_signature
+                    and not self._cache_partial and signature_after is not None):
+                self._ingest_rows(rows)
+                self._cache_signature = signature_after
+                self._cache_offset = signature_after[1]
+        return True
+
+    def _recover_journal(self):
+        """启动时按预写日志修复数据文件：重放未完成的追加，截断写了一半的行"""
+        journal = self.journal or WriteAheadJournal(self.journal_file)
+        with self.file_lock:
+            replayed, truncated = journal.recover(self.overtime_file)
+        if replayed:
+            print(f"↩ 已按预写日志恢复 {replayed} 次未完成的写入（截断 {truncated} 字节不完整数据）")
+
+    def _flush_loop(self):
+        """interval 策略的后台落盘线程"""
+        interval = max(self.fsync_interval_ms, 10) / 1000.0
+        while not self._flush_stop.wait(interval):
+            self.sync()
+
+    def sync(self):
+        """把已写入的记录落盘并清空预写日志"""
+        if self.storage is not None or not self._unsynced:
+            return
+        with self.file_lock:
+            try:
+                if os.path.exists(self.overtime_file):
+                    with open(self.overtime_file, 'ab') as f:
+                        os.fsync(f.fileno())
+                if self.journal is not None:
+                    self.journal.checkpoint()
+                self._unsynced = False
+            except OSError as e:
+                print(f"⚠ 数据落盘失败: {e}")
+
+    def _encode_rows(self, rows: List[List[str]], encoding: str) -> bytes:
+        """把行序列化为追加到数据文件的字节（与 csv.writer 写出的内容一致）"""
+        buffer = io.StringIO(newline='')
+        csv.writer(buffer).writerows(rows)
+        # BOM 只出现在文件开头，追加内容不带 BOM
+        if encoding.lower().replace("_", "-") == "utf-8-sig":
+            encoding = "utf-8"
+        return buffer.getvalue().encode(encoding)
+
+    def _rollback_append(self, signature_before, size_before: int):
+        """撤销一次未完成的追加写入（预写日志中对应的条目一并丢弃）"""
+        if self.journal is not None:
+            try:
+                self.journal.checkpoint()
+            except OSError as e:
+                print(f"✗ 清空预写日志失败: {e}")
         try:
-            # 🎯 使用 utf-8-sig 编码
-            with open(self.overtime_file, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow(record)
-            return True
-        except Exception as e:
-            print(f"✗ 添加记录失败: {e}")
-            return False
+            if signature_before is None:
+                if os.path.exists(self.overtime_file):
+                    os.remove(self.overtime_file)
+            elif os.path.getsize(self.overtime_file) > size_before:
+                os.truncate(self.overtime_file, size_before)
+                print(f"↩ 已回滚未完成的写入")
+        except OSError as e:
+            print(f"✗ 回滚写入失败: {e}")
 
     def get_all_records(self) -> List[List[str]]:
         """获取所有记录"""
+        if self.storage is not None:
+            return self.storage.get_all_records()
+        return self._get_csv_records()
+
+    def get_all_records_with_ids(self) -> List[Tuple[int, List[str]]]:
+        """获取所有记录及其ID，用于删除、修改"""
+        if self.storage is not None:
+            return self.storage.get_all_records_with_ids()
+        with self._cache_lock:
+            self._refresh_csv_cache()
+            return self._live_items()
+
+    def iter_records(self, filters: Dict[str, Any] = None, with_ids: bool = False):
+        """逐条产出记录（生成器），内存占用与记录总数无关
+
+        filters 与 get_filtered_records 相同，另支持 month（日期前缀，如 2024-03）；
+        with_ids 为 True 时产出 (记录ID, 记录)。
+        记录缓存已加载时按索引从缓存分批取出，否则直接流式读取数据文件且不建立缓存。
+        """
+        filters = filters or {}
+        if self.storage is not None:
+            items = self.storage.iter_records(filters)
+        elif self._cache_records is not None:
+            items = self._iter_cached(filters)
+        elif self.read_mode == "mmap" and set(filters) <= DATE_FILTER_KEYS:
+            items = self._iter_mapped(filters)
+        else:
+            items = self._iter_csv_file(filters)
+
+        if with_ids:
+            yield from items
+        else:
+            for _, record in items:
+                yield record
+
+    ITER_BATCH_SIZE = 1000
+
+    def _iter_cached(self, filters: Dict[str, Any]):
+        """从缓存分批取记录：先由索引确定记录ID，每批持锁取出，期间被删除的记录跳过
+
+        每批先刷新缓存：迭代期间后台压缩或 invalidate_cache 丢弃了缓存时重新加载（记录ID在压缩后不变）。
+        """
+        with self._cache_lock:
+            self._refresh_csv_cache()
+            plan = self._plan_query(filters)
+            if plan is None:
+                ids = list(self._get_index("rows", RowIndex.from_items).ids)
+                remaining = {}
+            else:
+                fetch, covered = plan
+                ids = fetch()
+                remaining = {k: v for k, v in filters.items() if k not in covered}
+
+        for start in range(0, len(ids), self.ITER_BATCH_SIZE):
+            batch = []
+            with self._cache_lock:
+                self._refresh_csv_cache()
+                records = self._cache_records
+                patches = self._ops_patches
+                deleted = self._ops_deleted
+                for record_id in ids[start:start + self.ITER_BATCH_SIZE]:
+                    record = patches.get(record_id) or records.get(record_id)
+                    if record is not None and record_id not in deleted:
+                        batch.append((record_id, record))
+            for record_id, record in batch:
+                if not remaining or match_filters(record, remaining):
+                    yield record_id, record
+
+    def _iter_mapped(self, filters: Dict[str, Any]):
+        """在内存映射的数据文件上分批读取，每批按记录ID续读（批次之间文件被压缩也不会错位）"""
+        last_id = 0
+        while True:
+            with self._cache_lock:
+                mapped = self._get_mapped(filters)
+                if mapped is None:
+                    break
+                try:
+                    start = mapped.position_after(last_id)
+                    stop = start + self.ITER_BATCH_SIZE
+                    batch = list(mapped.iter_items(filters, start, stop=stop))
+                    done = stop >= len(mapped)
+                    if not done:
+                        last_id = mapped.record_id(stop - 1)
+                finally:
+                    mapped.release()
+            yield from batch
+            if done:
+                return
+
+        # 无法映射（如编码不兼容）时退回流式读取
+        if last_id == 0:
+            yield from self._iter_csv_file(filters)
+
+    def _get_mapped(self, filters: Dict[str, Any] = None):
+        """mmap 读取方式下返回已映射的数据文件（需持有 _cache_lock，用完调用 release）
+
+        只处理日期类条件；不适用（其他读取方式/存储引擎、编码不兼容、文件不存在）时返回None。
+        """
+        if self.storage is not None or self.read_mode != "mmap":
+            return None
+        if filters and not set(filters) <= DATE_FILTER_KEYS:
+            return None
+        signature = self._file_signature()
+        if signature is None:
+            return None
+
+        # 文件被整体替换时重新检测编码
+        if self._mapped is not None and self._mapped.signature and self._mapped.signature[2] != signature[2]:
+            self._mapped = None
+        if self._mapped is None:
+            encoding = self._get_file_encoding()
+            if not MappedRecordFile.supports(encoding):
+                return None
+            self._mapped = MappedRecordFile(self.overtime_file, encoding)
+
+        ops_signature = self._file_signature(self.ops_file)
+        if self._mapped_ops is None or self._mapped_ops[0] != ops_signature:
+            self._mapped_ops = (ops_signature,) + self._read_ops_snapshot()
+        _, deleted, patches, _ = self._mapped_ops
+        try:
+            mapped = self._mapped.refresh(signature, self._mapped_ops[3])
+        except (OSError, ValueError) as e:
+            print(f"⚠ 数据文件映射失败: {e}")
+            self._mapped = None
+            return None
+        mapped.set_overlay(deleted, patches, ops_signature)
+        return mapped
+
+    def _mapped_call(self, filters: Dict[str, Any], fn):
+        """在映射的数据文件上执行 fn(mapped) 并解除映射；不适用时返回None"""
+        with self._cache_lock:
+            mapped = self._get_mapped(filters)
+            if mapped is None:
+                return None
+            try:
+                return fn(mapped)
+            finally:
+                mapped.release()
+
+    def _iter_csv_file(self, filters: Dict[str, Any]):
+        """不经缓存直接流式读取数据文件，记录ID分配规则与缓存一致"""
         if not os.path.exists(self.overtime_file):
-            return []
+            return
+        deleted, patches, id_floor = self._read_ops_snapshot()
+        encoding = self._get_file_encoding() or 'utf-8-sig'
 
-        # 🎯 尝试多种编码
-        encodings = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312']
-        for encoding in encodings:
+        # 已出现的ID，判断旧数据中重复/缺失的ID
+        seen = set()
+        rows = 0
+        max_id = 0
+        # 🎯 编码以文件头部检测，个别无法解码的字节替换显示，不中断整个读取
+        with open(self.overtime_file, 'r', encoding=encoding, errors='replace', newline='') as f:
+            reader = csv.reader(f)
+            has_ids = header_has_ids(next(reader, None) or [])
+            for row in reader:
+                if not row:
+                    continue
+                rows += 1
+                record_id = None
+                if has_ids:
+                    record_id = stored_record_id(row, max(max_id, id_floor) + rows)
+                if record_id is None or record_id in seen:
+                    record_id = rows
+                    if record_id in seen:
+                        record_id = max(max_id, rows) + 1
+                seen.add(record_id)
+                max_id = max(max_id, record_id)
+
+                if record_id in deleted:
+                    continue
+                record = patches.get(record_id)
+                if record is None:
+                    if len(row) >= RECORD_WIDTH:
+                        record = OvertimeRecord(*row[:RECORD_WIDTH])
+                    else:
+                        record = OvertimeRecord.from_row(row)
+                if match_filters(record, filters):
+                    yield record_id, record
+
+    def _read_ops_snapshot(self):
+        """读取操作日志，返回 (墓碑, 补丁, 已分配的最大ID)，不修改缓存状态"""
+        deleted, patches, max_id = set(), {}, 0
+        if not os.path.exists(self.ops_file):
+            return deleted, patches, max_id
+        try:
+            with open(self.ops_file, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.reader(f):
+                    if len(row) < 2 or not row[1].isdigit():
+                        continue
+                    record_id = int(row[1])
+                    if row[0] == "N":
+                        max_id = max(max_id, record_id)
+                    elif row[0] == "D":
+                        deleted.add(record_id)
+                        patches.pop(record_id, None)
+                    elif row[0] == "U" and len(row) >= 2 + RECORD_WIDTH:
+                        patches[record_id] = OvertimeRecord.from_row(row[2:2 + RECORD_WIDTH])
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"⚠ 操作日志读取失败: {e}")
+        return deleted, patches, max_id
+
+    def get_columnar(self):
+        """列式视图（ColumnarTable），用于向量化汇总
+
+        未安装NumPy、使用其他存储引擎（已有索引查询）或 mmap 读取方式（不完整加载记录）时返回None，
+        调用方走逐条计算。
+        """
+        if not numpy_available() or self.storage is not None or self.read_mode == "mmap":
+            return None
+        with self._cache_lock:
+            self._refresh_csv_cache()
+            return self._get_index("columnar", ColumnarTable.from_items)
+
+    def _records_by_ids(self, ids: List[int]) -> List[List[str]]:
+        """按ID取记录并叠加补丁（需持有 _cache_lock）"""
+        patches = self._ops_patches
+        records = self._cache_records
+        if not patches:
+            return [records[i] for i in ids]
+        return [patches.get(i, records[i]) for i in ids]
+
+    def _index_signature(self):
+        """派生索引对应的数据状态：数据文件和操作日志的签名"""
+        return [list(self._cache_signature) if self._cache_signature else None,
+                list(self._ops_signature) if self._ops_signature else None]
+
+    def _build_date_index(self, items) -> DateIndex:
+        """优先加载已保存的日期索引，数据文件有变化时重新排序并保存"""
+        index = DateIndex.load(self.date_index_file, self._index_signature())
+        if index is None or len(index) != len(items):
+            index = DateIndex.from_items(items)
+            self._save_date_index(index)
+        return index
+
+    def _save_date_index(self, index=None):
+        """保存日期索引（需持有 _cache_lock），失败不影响使用"""
+        if index is None:
+            index = self._indexes.get("date")
+        if index is None or self._cache_records is None:
+            return
+        try:
+            index.save(self.date_index_file, self._index_signature())
+        except OSError as e:
+            print(f"⚠ 日期索引保存失败: {e}")
+
+    def _get_index(self, name: str, build):
+        """获取派生索引，不存在时用当前记录构建（需持有 _cache_lock 并已刷新缓存）"""
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = build(self._live_items())
+        return index
+
+    def _get_csv_records(self) -> List[List[str]]:
+        """读取CSV记录（带缓存，文件只增长时仅解析新增部分）"""
+        with self._cache_lock:
+            self._refresh_csv_cache()
+            if not self._ops_deleted and not self._ops_patches:
+                return list(self._cache_records.values())
+            return [record for _, record in self._live_items()]
+
+    def _live_items(self) -> List[Tuple[int, List[str]]]:
+        """在缓存的原始记录上叠加墓碑和补丁"""
+        deleted = self._ops_deleted
+        patches = self._ops_patches
+        if not deleted and not patches:
+            return list(self._cache_records.items())
+        return [(record_id, patches.get(record_id, record))
+                for record_id, record in self._cache_records.items()
+                if record_id not in deleted]
+
+    def _refresh_csv_cache(self):
+        """按文件签名刷新缓存（需持有 _cache_lock）"""
+        signature = self._file_signature()
+        if signature is None:
+            self.invalidate_cache()
+            self._cache_records = {}
+            return
+
+        if self._cache_records is None or signature != self._cache_signature:
+            if not self._read_tail(signature):
+                self._read_records_from_file(signature)
+        self._refresh_ops()
+
+    def _ingest_rows(self, rows: List[List[str]]) -> List[int]:
+        """把解析出的行加入缓存并分配ID，返回ID列表"""
+        ids = []
+        added = []
+        for row in rows:
+            self._cache_rows += 1
+            record_id = None
+            if self._cache_has_ids:
+                record_id = stored_record_id(row, max(self._cache_max_id, self._cache_id_floor) + self._cache_rows)
+            if record_id is None or record_id in self._cache_records:
+                # 旧数据没有ID列，以行号作为ID
+                record_id = self._cache_rows
+                if record_id in self._cache_records:
+                    record_id = max(self._cache_max_id, self._cache_rows) + 1
+            # CSV 行均为字符串，列数足够时直接构建
+            if len(row) >= RECORD_WIDTH:
+                record = OvertimeRecord(*row[:RECORD_WIDTH])
+            else:
+                record = OvertimeRecord.from_row(row)
+            self._cache_records[record_id] = record
+            if record_id > self._cache_max_id:
+                self._cache_max_id = record_id
+            ids.append(record_id)
+            added.append((record_id, record))
+        for index in self._indexes.values():
+            index.append(added)
+        return ids
+
+    def _read_tail(self, signature) -> bool:
+        """只解析上次偏移之后新增的内容，无法增量读取时返回False"""
+        if self._cache_records is None or self._cache_encoding is None:
+            return False
+
+        size = signature[1]
+        if size < self._cache_offset:
+            return False
+        # 文件被整体替换（如恢复备份、压缩）时 inode 改变，必须完整重读
+        if self._cache_signature is not None and signature[2] != self._cache_signature[2]:
+            return False
+
+        try:
+            with open(self.overtime_file, 'rb') as f:
+                if f.read(len(self._cache_head)) != self._cache_head:
+                    return False
+                f.seek(self._cache_offset)
+                tail = f.read(size - self._cache_offset)
+            rows, complete_size, partial = self._parse_chunk(tail, self._cache_encoding)
+        except (OSError, UnicodeDecodeError, csv.Error):
+            return False
+
+        for record_id in self._cache_partial:
+            self._cache_records.pop(record_id, None)
+            for index in self._indexes.values():
+                index.delete(record_id)
+        self._cache_rows -= len(self._cache_partial)
+        ids = self._ingest_rows(rows)
+        self._cache_offset += complete_size
+        self._cache_partial = ids[len(ids) - partial:] if partial else []
+        self._cache_signature = signature
+        return True
+
+    def _parse_chunk(self, data: bytes, encoding: str, skip_header=False):
+        """解析一段字节，返回 (记录, 完整行的字节数, 末尾不完整行产生的记录数)"""
+        complete_size = data.rfind(b"\n") + 1
+        complete = data[:complete_size].decode(encoding)
+        reader = csv.reader(io.StringIO(complete, newline=''))
+        if skip_header:
+            next(reader, None)
+        rows = [row for row in reader if row]
+
+        partial = 0
+        if complete_size < len(data):
+            # 末尾缺少换行（例如手工编辑过），先计入结果，下次增量读取时重新解析
+            tail_rows = [row for row in csv.reader(io.StringIO(data[complete_size:].decode(encoding), newline='')) if row]
+            if skip_header and not rows and complete_size == 0:
+                tail_rows = tail_rows[1:]
+            rows.extend(tail_rows)
+            partial = len(tail_rows)
+        return rows, complete_size, partial
+
+    def _read_records_from_file(self, signature):
+        """从文件完整解析所有记录，并记录增量读取所需的状态"""
+        self._cache_records = {}
+        self._cache_signature = signature
+        self._indexes = {}
+        self._cache_offset = 0
+        self._cache_head = b""
+        self._cache_encoding = None
+        self._cache_rows = 0
+        self._cache_max_id = 0
+        self._cache_partial = []
+        self._cache_has_ids = True
+        self._cache_id_floor = 0
+
+        try:
+            with open(self.overtime_file, 'rb') as f:
+                data = f.read(signature[1])
+        except OSError as e:
+            print(f"✗ 读取数据文件失败: {e}")
+            return
+
+        encoding = self._get_file_encoding(data)
+        if encoding:
             try:
-                with open(self.overtime_file, 'r', encoding=encoding) as f:
-                    reader = csv.reader(f)
-                    next(reader, None)  # 跳过表头
-                    records = [row for row in reader if row]
-                    if records:
-                        print(f"✓ 使用编码 {encoding} 读取成功")
-                        return records
+                rows, complete_size, partial = self._parse_chunk(data, encoding, skip_header=True)
             except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                print(f"⚠ 编码 {encoding} 失败: {e}")
-                continue
+                # 记录的编码已不适用（文件内容被整体替换），重新检测
+                encoding = None
+
+        if not encoding:
+            encoding = self._detect_and_save_encoding(data, force_trial=True)
+            if not encoding:
+                print("✗ 无法识别数据文件编码")
+                return
+            rows, complete_size, partial = self._parse_chunk(data, encoding, skip_header=True)
+
+        # 只有表头第9列为“记录ID”时才读取ID列，旧数据/多出的其他列按行号分配
+        newline = data.find(b"\n")
+        head_line = (data if newline < 0 else data[:newline]).decode(encoding, errors='replace')
+        self._cache_has_ids = header_has_ids(next(csv.reader([head_line]), []))
+        self._cache_id_floor = self._read_ops_snapshot()[2]
+        ids = self._ingest_rows(rows)
+        self._cache_offset = complete_size
+        self._cache_head = data[:self.HEAD_CHECK_SIZE]
+        self._cache_encoding = encoding
+        self._cache_partial = ids[len(ids) - partial:] if partial else []
+
+    def _refresh_ops(self):
+        """操作日志变化时重新加载墓碑和补丁（需持有 _cache_lock）"""
+        signature = self._file_signature(self.ops_file)
+        if signature == self._ops_signature:
+            return
+
+        self._ops_deleted = set()
+        self._ops_patches = {}
+        self._ops_count = 0
+        self._ops_max_id = 0
+        self._ops_signature = signature
+        self._indexes = {}
+        if signature is None:
+            return
+
+        try:
+            with open(self.ops_file, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.reader(f):
+                    self._apply_op(row)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"⚠ 操作日志读取失败: {e}")
+
+    def _apply_op(self, row: List[str]):
+        """在内存中应用一条操作日志：D 删除 / U 修改 / N 已分配的最大ID"""
+        if len(row) < 2 or not row[1].isdigit():
+            return
+        record_id = int(row[1])
+        if row[0] == "N":
+            self._ops_max_id = max(self._ops_max_id, record_id)
+            return
+        if row[0] == "D":
+            self._ops_deleted.add(record_id)
+            self._ops_patches.pop(record_id, None)
+            for index in self._indexes.values():
+                index.delete(record_id)
+        elif row[0] == "U" and len(row) >= 2 + RECORD_WIDTH:
+            record = OvertimeRecord.from_row(row[2:2 + RECORD_WIDTH])
+            self._ops_patches[record_id] = record
+            if record_id not in self._ops_deleted and record_id in self._cache_records:
+                for index in self._indexes.values():
+                    index.update(record_id, record)
+        else:
+            return
+        self._ops_count += 1
+
+    def _append_op(self, row: List[str]) -> bool:
+        """追加一条操作日志并应用到缓存（需持有写锁，其他写入方不会同时修改日志）"""
+        with self._cache_lock:
+            self._refresh_csv_cache()
+            try:
+                with open(self.ops_file, 'a', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerow(row)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"✗ 写入操作日志失败: {e}")
+                self._ops_signature = None
+                return False
+
+            self._apply_op(row)
+            self._ops_signature = self._file_signature(self.ops_file)
+        return True
+
+    def delete_record(self, record_id: int) -> bool:
+        """删除记录：追加一条墓碑，O(1) 写入"""
+        if self.storage is not None:
+            return self.storage.delete_record(record_id)
+
+        with self.file_lock:
+            with self._cache_lock:
+                self._refresh_csv_cache()
+                if record_id not in self._cache_records or record_id in self._ops_deleted:
+                    return False
+            if not self._append_op(["D", str(record_id)]):
+                return False
+        self._maybe_compact()
+        return True
+
+    def update_record(self, record_id: int, fields: Dict[str, str]) -> bool:
+        """修改记录：fields 的键为字段名（date/user/type/...），追加一条补丁"""
+        if self.storage is not None:
+            return self.storage.update_record(record_id, fields)
+
+        unknown = [k for k in fields if k not in RECORD_COLUMNS]
+        if unknown:
+            print(f"✗ 未知字段: {unknown}")
+            return False
+
+        with self.file_lock:
+            with self._cache_lock:
+                self._refresh_csv_cache()
+                if record_id not in self._cache_records or record_id in self._ops_deleted:
+                    return False
+                record = list(self._ops_patches.get(record_id, self._cache_records[record_id]))
+            record.extend([""] * (RECORD_WIDTH - len(record)))
+            for key, value in fields.items():
+                record[RECORD_COLUMNS.index(key)] = str(value)
+            if not self._append_op(["U", str(record_id)] + record):
+                return False
+        self._maybe_compact()
+        return True
+
+    def _maybe_compact(self):
+        """墓碑比例超过阈值时在后台线程压缩数据文件"""
+        with self._cache_lock:
+            total = len(self._cache_records or {})
+            if (self._compacting or self._ops_count < self.COMPACT_MIN_OPS
+                    or self._ops_count < total * self.COMPACT_RATIO):
+                return
+            self._compacting = True
+
+        def run():
+            try:
+                self.compact()
+            finally:
+                self._compacting = False
+
+        threading.Thread(target=run, name="RecordCompactor", daemon=True).start()
+
+    def compact(self) -> bool:
+        """压缩：把墓碑和补丁合并进数据文件并清空操作日志，记录ID保持不变"""
+        if self.storage is not None:
+            return True
+
+        with self.file_lock:
+            with self._cache_lock:
+                self._refresh_csv_cache()
+                items = self._live_items()
+                encoding = self._cache_encoding or 'utf-8-sig'
+                max_id = max(self._cache_max_id, self._cache_rows, self._ops_max_id)
+
+            temp_file = self.overtime_file + ".compact"
+            try:
+                with open(temp_file, 'w', newline='', encoding=encoding) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(CSV_HEADER)
+                    for record_id, record in items:
+                        writer.writerow(list(record) + [str(record_id)])
+                    f.flush()
+                    os.fsync(f.fileno())
+                # 预写日志中的偏移对新文件不适用，替换前先清空并落盘
+                if self.journal is not None:
+                    self.journal.checkpoint(durable=True)
+                # 先替换数据文件再清空日志：中途读取最多重复应用一次幂等的操作
+                os.replace(temp_file, self.overtime_file)
+                self._unsynced = False
+                with open(self.ops_file, 'w', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerow(["N", str(max_id)])
+            except OSError as e:
+                print(f"✗ 压缩数据文件失败: {e}")
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+                return False
+
+            self.invalidate_cache()
+        print(f"✓ 数据文件已压缩，保留 {len(items)} 条记录")
+        return True
 
-        print("✗ 所有编码尝试失败")
-        return []
+    def _head_digest(self, head: bytes) -> str:
+        return hashlib.sha1(head).hexdigest()
+
+    def _get_file_encoding(self, data: bytes = None):
+        """获取数据文件编码：文件头部与记录一致时直接使用已记录的编码，否则重新检测"""
+        if self._encoding_info is None and os.path.exists(self.encoding_file):
+            try:
+                with open(self.encoding_file, 'r', encoding='utf-8') as f:
+                    self._encoding_info = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ 编码记录读取失败: {e}")
+                self._encoding_info = None
+
+        info = self._encoding_info
+        if info:
+            head_size = info.get('head_size', 0)
+            if data is not None:
+                head = data[:head_size]
+            else:
+                try:
+                    with open(self.overtime_file, 'rb') as f:
+                        head = f.read(head_size)
+                except OSError:
+                    return None
+            if len(head) == head_size and self._head_digest(head) == info.get('head_sha1'):
+                return info.get('encoding')
+
+        if data is None:
+            if not os.path.exists(self.overtime_file):
+                return None
+            with open(self.overtime_file, 'rb') as f:
+                data = f.read(self.ENCODING_SAMPLE_SIZE)
+        return self._detect_and_save_encoding(data)
+
+    def _detect_and_save_encoding(self, data: bytes, force_trial=False):
+        """检测编码并写入编码记录；force_trial 时对整段数据逐个尝试解码"""
+        sample = data[:self.ENCODING_SAMPLE_SIZE]
+        encoding = detect_encoding_from_bytes(sample, len(sample) == len(data))
+        if force_trial and encoding:
+            try:
+                data.decode(encoding)
+            except UnicodeDecodeError:
+                encoding = None
+        if force_trial and not encoding:
+            for candidate in ['utf-8-sig', 'utf-8', 'gbk', 'big5']:
+                try:
+                    data.decode(candidate)
+                    encoding = candidate
+                    break
+                except UnicodeDecodeError:
+                    continue
+        if not encoding:
+            return None
+
+        head = data[:self.HEAD_CHECK_SIZE]
+        self._encoding_info = {
+            'encoding': encoding,
+            'head_size': len(head),
+            'head_sha1': self._head_digest(head)
+        }
+        try:
+            with open(self.encoding_file, 'w', encoding='utf-8') as f:
+                json.dump(self._encoding_info, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠ 编码记录保存失败: {e}")
+        print(f"✓ 检测到数据文件编码: {encoding}")
+        return encoding
 
     def get_all_records_with_total(self) -> Tuple[List[List[str]], int]:
         """获取所有记录和总数"""
@@ -78,146 +956,285 @@ class DataManager:
 
     def get_monthly_records(self, month: str) -> List[List[str]]:
         """获取某月记录"""
-        all_records = self.get_all_records()
-        return [r for r in all_records if r and r[0].startswith(month)]
+        if self.storage is not None:
+            return self.storage.get_monthly_records(month)
 
-    def get_filtered_records(self, filters: Dict[str, Any]) -> Tuple[List[List[str]], int]:
-        """获取筛选后的记录"""
-        all_records = self.get_all_records()
-        filtered = all_records
+        records = self._mapped_call({'month': month},
+                                    lambda m: [r for _, r in m.iter_items({'month': month})])
+        if records is not None:
+            return records
 
-        # 用户筛选
-        if 'user' in filters:
-            filtered = [r for r in filtered if filters['user'] in r[1]]
+        # 日期索引二分定位该月区间
+        with self._cache_lock:
+            self._refresh_csv_cache()
+            ids = self._get_index("date", self._build_date_index).ids_with_prefix(month)
+            return self._records_by_ids(ids)
+
+    def get_filtered_records(self, filters: Dict[str, Any], limit: int = None,
+                             offset: int = 0) -> Tuple[List[List[str]], int]:
+        """获取筛选后的记录，返回 (本页记录, 总数)
+
+        选择命中数最少的索引（日期范围/用户/类型）作为驱动，其余条件一次遍历完成；
+        limit/offset 只取出一页，只有一个条件时总数直接取自索引。
+        """
+        if self.storage is not None:
+            return self.storage.get_filtered_records(filters, limit=limit, offset=offset)
 
-        # 日期筛选
-        if 'date_start' in filters:
-            filtered = [r for r in filtered if r[0] >= filters['date_start']]
-        if 'date_end' in filters:
-            filtered = [r for r in filtered if r[0] <= filters['date_end']]
+        result = self._mapped_call(filters, lambda m: self._mapped_filtered(m, filters, limit, offset))
+        if result is not None:
+            return result
 
-        # 类型筛选
+        with self._cache_lock:
+            self._refresh_csv_cache()
+            plan = self._plan_query(filters)
+            if plan is None:
+                return self._page_all(limit, offset)
+
+            fetch, covered = plan
+            ids = fetch()
+            remaining = {k: v for k, v in filters.items() if k not in covered}
+            if not remaining:
+                # 驱动索引已满足全部条件：总数即索引命中数，只取本页记录
+                return self._records_by_ids(page_slice(ids, limit, offset)), len(ids)
+
+            # 其余条件一次遍历：计数全部命中，只保留本页范围内的记录
+            records = (r for r in self._records_by_ids(ids) if match_filters(r, remaining))
+            return self._count_page(records, limit, offset)
+
+    @staticmethod
+    def _count_page(records, limit: int = None, offset: int = 0) -> Tuple[List[List[str]], int]:
+        """遍历全部命中记录计数，只保留本页范围内的记录"""
+        stop = None if limit is None else offset + limit
+        page = []
+        total = 0
+        for record in records:
+            if total >= offset and (stop is None or total < stop):
+                page.append(record)
+            total += 1
+        return page, total
+
+    def _mapped_filtered(self, mapped, filters, limit, offset) -> Tuple[List[List[str]], int]:
+        """mmap 方式的筛选：无条件时按位置直接取一页，日期条件按行首字节预筛"""
+        if not filters:
+            items = mapped.slice_items(offset, limit)
+            return [record for _, record in items], mapped.count_live()
+        return self._count_page((r for _, r in mapped.iter_items(filters)), limit, offset)
+
+    def page(self, filters: Dict[str, Any] = None, cursor: str = None, page_size: int = 20,
+             newest_first: bool = False) -> Tuple[List[Tuple[int, List[str]]], str]:
+        """游标分页：返回 ([(记录ID, 记录)], 下一页游标)，没有更多记录时游标为None
+
+        游标记录上一页最后一条记录ID，翻页期间新增或删除记录不会造成重复或遗漏；
+        newest_first 时从最新记录往前翻。游标无效时抛出 ValueError。
+        """
+        filters = filters or {}
+        after_id = decode_cursor(cursor)
+        page_size = max(1, int(page_size))
+
+        if self.storage is not None:
+            items = self.storage.page_items(filters, after_id, page_size + 1, newest_first)
+        else:
+            # mmap 方式：二分定位游标所在行，只解析本页
+            items = self._mapped_call(filters, lambda m: m.page_items(filters, after_id, page_size + 1, newest_first))
+        if items is None:
+            with self._cache_lock:
+                self._refresh_csv_cache()
+                plan = self._plan_query(filters)
+                if plan is None:
+                    # 无筛选条件：在行位置索引上二分定位，只读取一页
+                    ids = self._get_index("rows", RowIndex.from_items).ids
+                    remaining = {}
+                else:
+                    fetch, covered = plan
+                    ids = fetch()
+                    remaining = {k: v for k, v in filters.items() if k not in covered}
+                patches = self._ops_patches
+                records = self._cache_records
+                predicate = (lambda record: match_filters(record, remaining)) if remaining else None
+                items = scan_page(ids, after_id, page_size + 1, newest_first,
+                                  lambda record_id: patches.get(record_id, records[record_id]), predicate)
+
+        # 多取一条用于判断是否还有下一页
+        if len(items) > page_size:
+            items = items[:page_size]
+            return items, encode_cursor(items[-1][0])
+        return items, None
+
+    def _plan_query(self, filters: Dict[str, Any]):
+        """估算各索引的命中数，返回 (取记录ID的函数, 驱动索引已满足的条件)；无可用条件时返回None
+        （需持有 _cache_lock 并已刷新缓存）"""
+        plans = []
+        if 'date_start' in filters or 'date_end' in filters:
+            index = self._get_index("date", self._build_date_index)
+            start, end = filters.get('date_start'), filters.get('date_end')
+            plans.append((index.count_between(start, end),
+                          lambda: index.ids_between(start, end), ('date_start', 'date_end')))
+        if 'month' in filters:
+            month_index = self._get_index("date", self._build_date_index)
+            month = filters['month']
+            plans.append((month_index.count_with_prefix(month),
+                          lambda: month_index.ids_with_prefix(month), ('month',)))
+        if 'user' in filters:
+            user_index = self._get_index("user", UserIndex.from_items)
+            plans.append((user_index.count_containing(filters['user']),
+                          lambda: user_index.ids_containing(filters['user']), ('user',)))
         if 'type' in filters:
-            filtered = [r for r in filtered if r[2] == filters['type']]
+            type_index = self._get_index("type", TypeIndex.from_items)
+            plans.append((type_index.count(filters['type']),
+                          lambda: type_index.ids_for(filters['type']), ('type',)))
+        if not plans:
+            return None
+        _, fetch, covered = min(plans, key=lambda plan: plan[0])
+        return fetch, covered
 
-        return filtered, len(filtered)
+    def _page_all(self, limit: int = None, offset: int = 0) -> Tuple[List[List[str]], int]:
+        """无筛选条件：只取出一页，总数为有效记录数（需持有 _cache_lock）"""
+        deleted = self._ops_deleted
+        records = self._cache_records
+        total = len(records) - sum(1 for record_id in deleted if record_id in records)
+        if limit is None and not offset:
+            return [record for _, record in self._live_items()], total
 
-    def import_csv(self, file_path: str, default_user: str = "未知") -> Tuple[int, int, List[str]]:
-        """导入CSV记录"""
-        imported = 0
-        failed = 0
-        errors = []
+        live = (record_id for record_id in records if record_id not in deleted)
+        stop = None if limit is None else offset + limit
+        page_ids = list(islice(live, offset, stop))
+        return self._records_by_ids(page_ids), total
 
-        # 🎯 尝试多种编码
-        encodings = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312', 'big5']
+    def import_csv(self, file_path: str, default_user: str = "未知") -> Tuple[int, int, List[str]]:
+        """导入CSV记录：逐行校验后一次性写入，写入要么全部成功要么全部回滚"""
+        # 🎯 先检测编码，只打开一次文件
+        try:
+            encoding = detect_encoding(file_path)
+        except OSError as e:
+            return 0, 0, [f"文件读取失败: {str(e)}"]
+        encodings = [encoding] if encoding else ['utf-8-sig', 'utf-8', 'gbk', 'gb2312', 'big5']
 
         for encoding in encodings:
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    reader = csv.reader(f)
-                    headers = next(reader, None)
-
-                    for i, row in enumerate(reader, 1):
-                        if not row:
-                            continue
-
-                        try:
-                            # 处理可能的空字段
-                            if len(row) < 8:
-                                row.extend([""] * (8 - len(row)))
-
-                            # 确保有用户
-                            if not row[1]:
-                                row[1] = default_user
-
-                            # 验证日期格式
-                            datetime.strptime(row[0], "%Y-%m-%d")
-
-                            if self.add_record(row):
-                                imported += 1
-                            else:
-                                failed += 1
-                                errors.append(f"第{i}行: 保存失败")
-                        except ValueError:
-                            failed += 1
-                            errors.append(f"第{i}行: 日期格式错误")
-                        except Exception as e:
-                            failed += 1
-                            errors.append(f"第{i}行: {str(e)}")
-
-                        if len(errors) >= 5:
-                            errors.append("...更多错误省略")
-                            break
-
-                print(f"✓ 使用编码 {encoding} 导入成功")
-                return imported, failed, errors[:5]
-
+                valid_rows, failed, errors = self._validate_import_rows(file_path, encoding, default_user)
             except UnicodeDecodeError:
                 continue
             except Exception as e:
-                errors.append(f"编码 {encoding} 失败: {str(e)}")
-                continue
+                return 0, 0, [f"文件读取失败: {str(e)}"]
+
+            print(f"✓ 使用编码 {encoding} 读取导入文件")
+            if not valid_rows:
+                return 0, failed, errors
+
+            if not self.add_records(valid_rows):
+                errors.append(f"批量写入失败，已回滚，{len(valid_rows)} 条记录未导入")
+                return 0, failed + len(valid_rows), errors
+
+            print(f"✓ 导入 {len(valid_rows)} 条记录")
+            return len(valid_rows), failed, errors
 
         return 0, 0, ["文件读取失败，所有编码尝试均失败"]
 
-    def export_excel(self, file_path: str) -> bool:
-        """导出到Excel"""
+    def _validate_import_rows(self, file_path: str, encoding: str, default_user: str):
+        """流式校验导入文件，返回 (有效记录, 失败数, 全部错误信息)"""
+        valid_rows = []
+        failed = 0
+        errors = []
+
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # 跳过表头
+
+            for i, row in enumerate(reader, 1):
+                if not row:
+                    continue
+
+                try:
+                    # 处理可能的空字段
+                    if len(row) < 8:
+                        row.extend([""] * (8 - len(row)))
+
+                    # 确保有用户
+                    if not row[1]:
+                        row[1] = default_user
+
+                    # 验证日期格式
+                    datetime.strptime(row[0], "%Y-%m-%d")
+                    valid_rows.append(row)
+                except ValueError:
+                    failed += 1
+                    errors.append(f"第{i}行: 日期格式错误")
+                except Exception as e:
+                    failed += 1
+                    errors.append(f"第{i}行: {str(e)}")
+
+        return valid_rows, failed, errors
+
+    EXPORT_HEADERS = ["日期", "用户", "类型", "加班时长", "请假类型", "请假时长", "提交时间", "加班工资"]
+    # 列宽按开头这么多行估算（write_only 模式的列宽必须在写入第一行数据之前设置）
+    EXPORT_WIDTH_SAMPLE = 1000
+    # 每写入这么多行回调一次进度
+    EXPORT_PROGRESS_STEP = 1000
+
+    def export_excel(self, file_path: str, progress=None) -> bool:
+        """导出到Excel：write_only 模式逐行写出，内存占用与记录数无关
+
+        progress(已写入行数, 总行数) 在导出过程中定期回调（在导出所在线程中调用），
+        总行数无法不加载数据就得到时为None。
+        """
         try:
             # 检查openpyxl是否安装
             try:
                 from openpyxl import Workbook
+                from openpyxl.cell import WriteOnlyCell
                 from openpyxl.styles import Font, Alignment, PatternFill
+                from openpyxl.utils import get_column_letter
             except ImportError:
                 print("✗ 未安装openpyxl，请执行: pip install openpyxl")
                 return False
 
-            records = self.get_all_records()
-
-            if not records:
+            # 逐条读取记录，只缓冲开头用于估算列宽的部分
+            records = self.iter_records()
+            sample = list(islice(records, self.EXPORT_WIDTH_SAMPLE))
+            if not sample:
                 print("⚠ 没有数据可导出")
                 return False
+            total = self._known_total() if progress else None
 
-            # 创建工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "加班记录"
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("加班记录")
+
+            # 列宽：表头和样本行的最大长度，最小宽度8，最大宽度50
+            widths = [len(header) for header in self.EXPORT_HEADERS]
+            for record in sample:
+                for col, value in enumerate(record[:len(widths)]):
+                    if len(value) > widths[col]:
+                        widths[col] = len(value)
+            for col, width in enumerate(widths, 1):
+                ws.column_dimensions[get_column_letter(col)].width = min(max(width + 2, 8), 50)
 
             # 表头
-            headers = ["日期", "用户", "类型", "加班时长", "请假类型", "请假时长", "提交时间", "加班工资"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-                cell.font.color = "FFFFFF"
-                cell.alignment = Alignment(horizontal="center")
-
-            # 数据
-            for row_idx, record in enumerate(records, 2):
-                for col_idx, value in enumerate(record, 1):
-                    # 🎯 确保值不为None
-                    cell_value = str(value) if value is not None else ""
-                    ws.cell(row=row_idx, column=col_idx, value=cell_value)
-
-            # 调整列宽
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        cell_value = str(cell.value) if cell.value else ""
-                        if len(cell_value) > max_length:
-                            max_length = len(cell_value)
-                    except:
-                        pass
-                # 最小宽度8，最大宽度50
-                ws.column_dimensions[column].width = min(max(max_length + 2, 8), 50)
+            font = Font(bold=True, color="FFFFFF")
+            fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+            alignment = Alignment(horizontal="center")
+            header_cells = []
+            for header in self.EXPORT_HEADERS:
+                cell = WriteOnlyCell(ws, value=header)
+                cell.font, cell.fill, cell.alignment = font, fill, alignment
+                header_cells.append(cell)
+            ws.append(header_cells)
+
+            # 数据：记录字段均为字符串，直接逐行追加
+            written = 0
+            for record in chain(sample, records):
+                ws.append(record[:8])
+                written += 1
+                if progress and written % self.EXPORT_PROGRESS_STEP == 0:
+                    progress(written, None if total is None else max(total, written))
 
             #确保目录存在
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
 
             # 保存文件
             wb.save(file_path)
-            print(f"✓ Excel文件已保存: {file_path}")
+            if progress:
+                progress(written, written)
+            print(f"✓ Excel文件已保存: {file_path}（{written} 条记录）")
             return True
 
         except PermissionError:
@@ -229,15 +1246,118 @@ class DataManager:
             traceback.print_exc()
             return False
 
+    def _known_total(self):
+        """不额外读取数据即可得到的有效记录数，得不到时返回None
+
+        供导出进度使用：不能为了显示总数把全部记录加载进缓存。
+        存储引擎取自引擎自身的计数，mmap 方式取自行偏移索引，缓存方式只在缓存已加载时计算。
+        """
+        if self.storage is not None:
+            return self.storage.count()
+        if self.read_mode == "mmap":
+            return self._mapped_call({}, lambda mapped: mapped.count_live())
+        with self._cache_lock:
+            if self._cache_records is None:
+                return None
+            self._refresh_csv_cache()
+            return self._page_all(limit=0)[1]
+
+    def export(self, file_path: str, fmt: str = None, progress=None) -> bool:
+        """按格式导出全部记录：excel / csv_gz / ndjson / parquet，fmt 为空时按扩展名判断
+
+        除Excel外均逐条读取记录流式写出，写完后原子替换目标文件。
+        """
+        fmt = fmt or detect_format(file_path)
+        if fmt == "excel":
+            return self.export_excel(file_path, progress)
+        writer = WRITERS.get(fmt)
+        if writer is None:
+            print(f"✗ 不支持的导出格式: {fmt or file_path}")
+            return False
+        if fmt == "parquet" and not pyarrow_available():
+            print("✗ 未安装pyarrow，请执行: pip install pyarrow")
+            return False
+
+        try:
+            items = self.iter_records(with_ids=True)
+            first = next(items, None)
+            if first is None:
+                print("⚠ 没有数据可导出")
+                return False
+            total = self._known_total() if progress else None
+            count = writer(file_path, self._with_progress(chain([first], items), total, progress))
+            if progress:
+                progress(count, count)
+            print(f"✓ 导出完成: {file_path}（{count} 条记录）")
+            return True
+        except PermissionError:
+            print(f"✗ 权限错误，文件可能被占用: {file_path}")
+            return False
+        except Exception as e:
+            print(f"✗ 导出失败: {e}")
+            return False
+
+    def _with_progress(self, items, total, progress):
+        """逐条透传，每 EXPORT_PROGRESS_STEP 条回调一次进度（total 为None时总数未知）"""
+        if not progress:
+            yield from items
+            return
+        done = 0
+        for item in items:
+            yield item
+            done += 1
+            if done % self.EXPORT_PROGRESS_STEP == 0:
+                progress(done, None if total is None else max(total, done))
+
+    def export_async(self, file_path: str, fmt: str = None, progress=None, on_done=None) -> threading.Thread:
+        """在后台线程导出，完成后以 on_done(是否成功) 回调；回调均在后台线程中调用"""
+        def run():
+            result = self.export(file_path, fmt, progress)
+            if on_done:
+                on_done(result)
+
+        thread = threading.Thread(target=run, name="export", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """停止写入线程、保存日期索引并关闭存储引擎"""
+        self._writer.stop()
+        if self._flusher is not None:
+            self._flush_stop.set()
+            self._flusher.join()
+        self.sync()
+        if self._mapped is not None:
+            self._mapped.release()
+        if self.storage is not None:
+            self.storage.close()
+        elif "date" in self._indexes:
+            with self._cache_lock:
+                self._refresh_csv_cache()
+                self._save_date_index()
+
     def backup(self) -> bool:
         """备份数据文件"""
+        if self.storage is not None:
+            try:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                backup_file = os.path.join(self.backup_dir, f"overtime_records_{timestamp}{self.storage.BACKUP_SUFFIX}")
+                self.storage.backup(backup_file)
+                print(f"✓ 备份成功: {backup_file}")
+                return True
+            except Exception as e:
+                print(f"✗ 备份失败: {e}")
+                return False
+
         if not os.path.exists(self.overtime_file):
             return False
 
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = os.path.join(self.backup_dir, f"overtime_records_{timestamp}.csv")
-            shutil.copy2(self.overtime_file, backup_file)
+            # 持有写锁复制，避免复制到写了一半的行
+            with self.file_lock:
+                shutil.copy2(self.overtime_file, backup_file)
             print(f"✓ 备份成功: {backup_file}")
             return True
         except Exception as e:
@@ -0,0 +1,117 @@
+# core/date_index.py
+import os
+import json
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, List, Tuple
+
+# 比任何记录ID都大，用于区间上界
+_MAX_ID = float("inf")
+
+
+class DateIndex:
+    """日期有序索引：按 (日期, 记录ID) 排序，区间和月份查询用 bisect 定位，O(log n + k)
+
+    日期按字符串比较，与原来 r[0] >= date_start / startswith(month) 的语义一致。
+    可保存到数据文件旁的 JSON，启动时数据文件未变化则直接加载，无需重新排序。
+    """
+
+    VERSION = 1
+
+    def __init__(self, entries: List[Tuple[str, int]] = None):
+        self._entries = entries or []  # 已排序的 (日期, 记录ID)
+        self._date_of = {record_id: date for date, record_id in self._entries}
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[int, List[str]]]) -> "DateIndex":
+        return cls(sorted((record[0], record_id) for record_id, record in items))
+
+    def append(self, items: Iterable[Tuple[int, List[str]]]):
+        """追加 (记录ID, 记录)；已存在的ID视为修改"""
+        for record_id, record in items:
+            date = record[0]
+            old_date = self._date_of.get(record_id)
+            if old_date == date:
+                continue
+            if old_date is not None:
+                self.delete(record_id)
+            self._date_of[record_id] = date
+            entry = (date, record_id)
+            # 新记录通常是最近的日期，末尾追加时无需移动元素
+            if not self._entries or self._entries[-1] < entry:
+                self._entries.append(entry)
+            else:
+                insort(self._entries, entry)
+
+    def update(self, record_id: int, record):
+        self.append([(record_id, record)])
+
+    def delete(self, record_id: int):
+        date = self._date_of.pop(record_id, None)
+        if date is None:
+            return
+        pos = bisect_left(self._entries, (date, record_id))
+        if pos < len(self._entries) and self._entries[pos] == (date, record_id):
+            del self._entries[pos]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _range(self, date_start: str = None, date_end: str = None) -> Tuple[int, int]:
+        lo = bisect_left(self._entries, (date_start,)) if date_start is not None else 0
+        hi = bisect_right(self._entries, (date_end, _MAX_ID)) if date_end is not None else len(self._entries)
+        return lo, max(lo, hi)
+
+    def count_between(self, date_start: str = None, date_end: str = None) -> int:
+        """区间内的记录数，O(log n)"""
+        lo, hi = self._range(date_start, date_end)
+        return hi - lo
+
+    def ids_between(self, date_start: str = None, date_end: str = None) -> List[int]:
+        """date_start <= 日期 <= date_end 的记录ID（按ID升序，即写入顺序）"""
+        lo, hi = self._range(date_start, date_end)
+        return sorted(record_id for _, record_id in self._entries[lo:hi])
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._entries, (prefix,))
+        hi = bisect_left(self._entries, (prefix + "\U0010ffff",))
+        return lo, hi
+
+    def count_with_prefix(self, prefix: str) -> int:
+        """日期以 prefix 开头的记录数，O(log n)"""
+        lo, hi = self._prefix_range(prefix)
+        return hi - lo
+
+    def ids_with_prefix(self, prefix: str) -> List[int]:
+        """日期以 prefix 开头（如月份 YYYY-MM）的记录ID（按ID升序）"""
+        lo, hi = self._prefix_range(prefix)
+        return sorted(record_id for _, record_id in self._entries[lo:hi])
+
+    # ---------- 持久化 ----------
+
+    def save(self, path: str, signature):
+        """保存索引，signature 标识对应的数据文件状态"""
+        data = {
+            "version": self.VERSION,
+            "signature": signature,
+            "dates": [date for date, _ in self._entries],
+            "ids": [record_id for _, record_id in self._entries],
+        }
+        temp_file = path + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path: str, signature):
+        """加载索引；文件不存在、版本不符或数据文件已变化时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != cls.VERSION or data.get("signature") != signature:
+            return None
+        dates, ids = data.get("dates", []), data.get("ids", [])
+        if len(dates) != len(ids):
+            return None
+        return cls(list(zip(dates, ids)))
@@ -0,0 +1,157 @@
+# core/exporters.py
+import os
+import csv
+import gzip
+import json
+from typing import Any, Dict, Iterable, Tuple
+
+from core.record import OvertimeRecord
+from core.storage import CSV_HEADER
+
+# pyarrow 为可选依赖：未安装时不提供 Parquet 导出
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# 文件扩展名 -> 导出格式（较长的扩展名在前，.csv.gz 优先于 .gz）
+EXPORT_FORMATS = [
+    (".xlsx", "excel"),
+    (".csv.gz", "csv_gz"),
+    (".ndjson", "ndjson"),
+    (".jsonl", "ndjson"),
+    (".parquet", "parquet"),
+]
+
+# 日期序数与 1970-01-01 的差值（Parquet date32 以天数存储）
+_EPOCH_ORDINAL = 719163
+PARQUET_BATCH_SIZE = 10000
+
+
+def pyarrow_available() -> bool:
+    return pa is not None
+
+
+def detect_format(file_path: str):
+    """按扩展名判断导出格式，无法识别时返回None"""
+    name = file_path.lower()
+    for suffix, fmt in EXPORT_FORMATS:
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def _parse_leave_hours(text: str):
+    """请假时长："无"或空为None，其余按数值解析"""
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def typed_record(record_id: int, record) -> Dict[str, Any]:
+    """转换为带类型的字段：时长为数值、工资为整数分，供 NDJSON / Parquet 使用"""
+    record = OvertimeRecord.from_row(record)
+    return {
+        "id": record_id,
+        "date": record.date,
+        "user": record.user,
+        "type": record.day_type,
+        "hours": record.hours,
+        "leave_type": record.leave_type,
+        "leave_hours": _parse_leave_hours(record.leave_hours),
+        "submit_time": record.submit_time,
+        "salary_cents": record.salary_cents,
+    }
+
+
+def _replace_when_done(file_path: str, write):
+    """先写临时文件，完成后原子替换，失败时删除临时文件"""
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    temp_file = file_path + ".tmp"
+    try:
+        count = write(temp_file)
+        os.replace(temp_file, file_path)
+        return count
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def write_csv_gz(file_path: str, items: Iterable[Tuple[int, Any]]) -> int:
+    """gzip 压缩的CSV（UTF-8，含记录ID列，与数据文件列相同），返回写出的记录数"""
+    def write(temp_file):
+        count = 0
+        with gzip.open(temp_file, 'wt', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for record_id, record in items:
+                writer.writerow(list(record[:8]) + [record_id])
+                count += 1
+        return count
+    return _replace_when_done(file_path, write)
+
+
+def write_ndjson(file_path: str, items: Iterable[Tuple[int, Any]]) -> int:
+    """JSON Lines：每行一条带类型的记录，返回写出的记录数"""
+    def write(temp_file):
+        count = 0
+        with open(temp_file, 'w', encoding='utf-8', newline='\n') as f:
+            for record_id, record in items:
+                f.write(json.dumps(typed_record(record_id, record), ensure_ascii=False,
+                                   separators=(',', ':')))
+                f.write("\n")
+                count += 1
+        return count
+    return _replace_when_done(file_path, write)
+
+
+def write_parquet(file_path: str, items: Iterable[Tuple[int, Any]]) -> int:
+    """Parquet：带类型的列（日期为 date32、工资为 int64 分），分批写入行组，返回写出的记录数"""
+    if pa is None:
+        raise RuntimeError("未安装pyarrow，请执行: pip install pyarrow")
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("date", pa.date32()),
+        ("user", pa.string()),
+        ("type", pa.string()),
+        ("hours", pa.float64()),
+        ("leave_type", pa.string()),
+        ("leave_hours", pa.float64()),
+        ("submit_time", pa.string()),
+        ("salary_cents", pa.int64()),
+    ])
+
+    def flush(writer, rows):
+        columns = {name: [row[name] for row in rows] for name in schema.names}
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+
+    def write(temp_file):
+        count = 0
+        rows = []
+        with pq.ParquetWriter(temp_file, schema, compression="snappy") as writer:
+            for record_id, record in items:
+                record = OvertimeRecord.from_row(record)
+                row = typed_record(record_id, record)
+                # 格式不规范的日期序数为0，写为空值
+                row["date"] = record.ordinal - _EPOCH_ORDINAL if record.ordinal else None
+                rows.append(row)
+                if len(rows) >= PARQUET_BATCH_SIZE:
+                    flush(writer, rows)
+                    count += len(rows)
+                    rows = []
+            if rows or not count:
+                flush(writer, rows)
+                count += len(rows)
+        return count
+    return _replace_when_done(file_path, write)
+
+
+WRITERS = {
+    "csv_gz": write_csv_gz,
+    "ndjson": write_ndjson,
+    "parquet": write_parquet,
+}
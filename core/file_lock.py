@@ -0,0 +1,89 @@
+# core/file_lock.py
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+class FileLock:
+    """跨进程咨询锁（POSIX 使用 fcntl.flock，Windows 使用 msvcrt.locking）
+
+    同一实例在同一进程内可重入；不同进程（或不同实例）之间互斥。
+    用于保护数据文件的追加、恢复和压缩，读取方不加锁。
+    """
+
+    def __init__(self, lock_path: str, timeout: float = 30):
+        self.lock_path = lock_path
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth > 0:
+            self._depth += 1
+            return
+
+        try:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    self._lock_fd(fd)
+                    break
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise TimeoutError(f"等待文件锁超时: {self.lock_path}")
+                    time.sleep(0.01)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+        self._fd = fd
+        self._depth = 1
+
+    def release(self):
+        if self._depth == 0:
+            raise RuntimeError("释放未持有的文件锁")
+
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_fd(self._fd)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    @staticmethod
+    def _lock_fd(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    @staticmethod
+    def _unlock_fd(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -0,0 +1,103 @@
+# core/journal.py
+import os
+import struct
+import zlib
+from typing import List, Tuple
+
+# 条目格式：魔数 + (序号, 数据文件偏移, 数据长度, CRC32) + 数据
+_MAGIC = b"OTJ1"
+_HEADER = struct.Struct("<4sQQII")
+
+# fsync 策略：每次写入 / 每批写入 / 按时间间隔
+FSYNC_POLICIES = ("write", "batch", "interval")
+
+
+class WriteAheadJournal:
+    """数据文件追加写入的预写日志
+
+    追加前先把要写入的字节连同目标偏移和校验和写入日志，再写数据文件；
+    数据文件落盘后清空日志（检查点）。启动时若日志中仍有条目，逐条校验：
+    数据文件中已完整存在的跳过，写了一半或未写入的截断后重放，校验失败的残缺条目丢弃。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._seq = 0
+
+    def append(self, offset: int, payload: bytes, sync: bool = False):
+        """记录一次即将写入数据文件 offset 处的追加；sync 时日志先落盘"""
+        self._seq += 1
+        crc = zlib.crc32(payload, zlib.crc32(struct.pack("<QQ", self._seq, offset)))
+        header = _HEADER.pack(_MAGIC, self._seq, offset, len(payload), crc)
+        with open(self.path, 'ab') as f:
+            f.write(header + payload)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+
+    def checkpoint(self, durable: bool = False):
+        """数据文件已落盘，清空日志
+
+        一般不必立即落盘：残留的条目在数据文件中已完整存在，恢复时会被跳过；
+        数据文件被整体替换（压缩、恢复备份）前需 durable=True，避免旧偏移作用于新文件。
+        """
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'r+b') as f:
+                f.truncate(0)
+                if durable:
+                    os.fsync(f.fileno())
+        self._seq = 0
+
+    def entries(self) -> List[Tuple[int, bytes]]:
+        """读取校验通过的条目 [(偏移, 数据)]，遇到残缺或校验失败的条目即停止"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return []
+
+        entries = []
+        pos = 0
+        while pos + _HEADER.size <= len(data):
+            magic, seq, offset, length, crc = _HEADER.unpack_from(data, pos)
+            start = pos + _HEADER.size
+            payload = data[start:start + length]
+            if magic != _MAGIC or len(payload) != length:
+                break
+            if zlib.crc32(payload, zlib.crc32(struct.pack("<QQ", seq, offset))) != crc:
+                break
+            entries.append((offset, payload))
+            pos = start + length
+        if pos < len(data):
+            print(f"⚠ 预写日志末尾有 {len(data) - pos} 字节残缺条目，已丢弃")
+        return entries
+
+    def recover(self, data_path: str) -> Tuple[int, int]:
+        """按日志修复数据文件，返回 (重放的条目数, 截断的字节数)；修复后清空日志"""
+        entries = self.entries()
+        replayed = 0
+        truncated = 0
+        if entries and os.path.exists(data_path):
+            with open(data_path, 'r+b') as f:
+                for offset, payload in entries:
+                    size = f.seek(0, os.SEEK_END)
+                    if size >= offset + len(payload):
+                        f.seek(offset)
+                        if f.read(len(payload)) == payload:
+                            continue  # 已完整写入
+                        print(f"⚠ 数据文件偏移 {offset} 处的内容与预写日志不一致，跳过该条目")
+                        continue
+                    f.seek(offset)
+                    if size < offset or f.read() != payload[:size - offset]:
+                        print(f"⚠ 数据文件与预写日志记录的偏移 {offset} 不符，跳过该条目")
+                        continue
+                    # 未写入或只写了一部分：截断到条目起点后重放
+                    truncated += size - offset
+                    f.truncate(offset)
+                    f.seek(offset)
+                    f.write(payload)
+                    replayed += 1
+                f.flush()
+                os.fsync(f.fileno())
+        self.checkpoint()
+        return replayed, truncated
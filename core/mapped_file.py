@@ -0,0 +1,279 @@
+# core/mapped_file.py
+import os
+import csv
+import mmap
+from array import array
+from itertools import islice
+from typing import Any, Dict, List, Tuple
+
+from core.record import OvertimeRecord
+from core.storage import RECORD_WIDTH, header_has_ids, match_filters, stored_record_id
+
+# 只看日期列即可判断的条件，可直接比较每行开头的字节
+DATE_FILTER_KEYS = frozenset(('date_start', 'date_end', 'month'))
+_DATE_LENGTH = 10
+
+
+class MappedRecordFile:
+    """内存映射的数据文件：只建立行首偏移索引，按需解析单行
+
+    打开时扫描一遍换行符记录每个数据行的起始偏移（不解码、不建记录对象），
+    之后按行号随机访问，翻到第N页或按日期筛选只解码用到的行。
+    表头含记录ID列时，扫描时顺带取出每行末列的ID（只切分字节，不解码整行）。
+    要求编码兼容ASCII（utf-8/gbk等，换行符不会出现在多字节字符中），且记录内不含换行。
+    记录ID规则与缓存一致：表头含记录ID列且值在合理范围内时取ID列，否则取行号；
+    ID随行号递增，游标定位用二分查找。
+    """
+
+    ASCII_COMPATIBLE = ('utf-8', 'utf-8-sig', 'utf8', 'gbk', 'gb2312', 'gb18030', 'big5', 'ascii')
+
+    def __init__(self, path: str, encoding: str):
+        self.path = path
+        self.encoding = encoding
+        self.signature = None
+        self._file = None
+        self._mm = None
+        self._size = 0
+        self._starts = array('q')  # 数据行（不含表头）的起始偏移
+        self._scanned = 0          # 已扫描到的偏移（最后一个完整行之后）
+        self._header_done = False
+        self._has_ids = False
+        self._ids = array('q')     # 各数据行的记录ID（仅表头含ID列时）
+        self._id_max = 0           # 已完整扫描的行中的最大ID
+        self._id_floor = 0         # 操作日志中已分配的最大ID
+        # 操作日志叠加：墓碑、补丁，以及墓碑所在行号的缓存
+        self._deleted = frozenset()
+        self._patches = {}
+        self._overlay_key = None
+        self._holes = None
+
+    @classmethod
+    def supports(cls, encoding: str) -> bool:
+        return bool(encoding) and encoding.lower() in cls.ASCII_COMPATIBLE
+
+    # ---------- 映射与行索引 ----------
+
+    def refresh(self, signature, id_floor: int = 0) -> "MappedRecordFile":
+        """映射文件：只增长时继续扫描新增部分，被替换或截短时重建行索引
+
+        id_floor 为操作日志中已分配的最大ID，取ID列时用于判断值是否在合理范围内。
+        """
+        if (self.signature is None or signature[2] != self.signature[2]
+                or signature[1] < self._size or id_floor != self._id_floor):
+            self._starts = array('q')
+            self._scanned = 0
+            self._header_done = False
+            self._has_ids = False
+            self._ids = array('q')
+            self._id_max = id_floor
+            self._id_floor = id_floor
+            self._holes = None
+
+        self.release()
+        self._file = open(self.path, 'rb')
+        self._size = os.fstat(self._file.fileno()).st_size
+        if self._size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if signature != self.signature:
+            self._scan()
+            self._holes = None
+        self.signature = signature
+        return self
+
+    def _scan(self):
+        """从上次位置继续查找换行符，记录新的行首偏移"""
+        mm, size = self._mm, self._size
+        if mm is None:
+            return
+        # 上次末尾不完整的行已记入行首，继续扫描前先撤回
+        if self._starts and self._starts[-1] >= self._scanned:
+            self._starts.pop()
+            if self._has_ids:
+                self._ids.pop()
+        pos = self._scanned
+        if not self._header_done:
+            end = mm.find(b"\n", 0)
+            if end < 0:
+                return
+            pos = end + 1
+            self._header_done = True
+            header = mm[0:end].rstrip(b"\r").decode(self.encoding, errors='replace')
+            self._has_ids = header_has_ids(next(csv.reader([header]), []))
+
+        starts = self._starts
+        find = mm.find
+        has_ids = self._has_ids
+        while pos < size:
+            end = find(b"\n", pos)
+            if end < 0:
+                break
+            if end > pos and mm[pos:end] != b"\r":
+                starts.append(pos)
+                if has_ids:
+                    self._id_max = max(self._id_max, self._scan_id(pos, end))
+            pos = end + 1
+        self._scanned = pos
+        # 末尾缺少换行的行（例如正在写入），先按一行计入，下次刷新时重新扫描
+        if pos < size and mm[pos:size].strip():
+            starts.append(pos)
+            if has_ids:
+                self._scan_id(pos, size)
+
+    def _scan_id(self, start: int, end: int) -> int:
+        """取出新扫描到的一行的记录ID并记录，规则与缓存一致（见 stored_record_id）"""
+        line = self._mm[start:end].rstrip(b"\r\n")
+        if b'"' not in line:
+            row = line.decode(self.encoding, errors='replace').split(",")
+        else:
+            row = next(csv.reader([line.decode(self.encoding, errors='replace')]), [])
+        count = len(self._ids) + 1
+        record_id = stored_record_id(row, self._id_max + count) or count
+        self._ids.append(record_id)
+        return record_id
+
+    def release(self):
+        """解除映射并关闭文件，保留行索引（Windows 下映射中的文件无法被替换）"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self._starts)
+
+    def _line(self, pos: int) -> bytes:
+        start = self._starts[pos]
+        end = self._starts[pos + 1] if pos + 1 < len(self._starts) else self._size
+        return self._mm[start:end].rstrip(b"\r\n")
+
+    def set_overlay(self, deleted, patches, key):
+        """设置操作日志的墓碑和补丁；key 变化时重新定位墓碑所在行"""
+        if key != self._overlay_key or self._holes is None:
+            self._holes = None
+        self._overlay_key = key
+        self._deleted = deleted
+        self._patches = patches
+
+    # ---------- 按行解析 ----------
+
+    def item(self, pos: int) -> Tuple[int, OvertimeRecord]:
+        """解析第 pos 个数据行，返回 (记录ID, 记录)，已修改的记录返回补丁内容"""
+        text = self._line(pos).decode(self.encoding, errors='replace')
+        row = next(csv.reader([text]), [])
+        record_id = self.record_id(pos)
+        patched = self._patches.get(record_id)
+        if patched is not None:
+            return record_id, patched
+        if len(row) >= RECORD_WIDTH:
+            return record_id, OvertimeRecord(*row[:RECORD_WIDTH])
+        return record_id, OvertimeRecord.from_row(row)
+
+    def record_id(self, pos: int) -> int:
+        """第 pos 行的记录ID（扫描时已取出，表头无ID列时为行号）"""
+        return self._ids[pos] if self._has_ids else pos + 1
+
+    def max_id(self) -> int:
+        """最后一行的记录ID（ID随行号递增）"""
+        return self.record_id(len(self._starts) - 1) if self._starts else 0
+
+    def position_after(self, record_id: int) -> int:
+        """第一个记录ID大于 record_id 的行号（二分查找，只解析 O(log n) 行）"""
+        lo, hi = 0, len(self._starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.record_id(mid) <= record_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _raw_date(self, pos: int):
+        """行首的日期字段（未加引号的 YYYY-MM-DD），无法直接判断时返回None"""
+        start = self._starts[pos]
+        raw = self._mm[start:start + _DATE_LENGTH + 1]
+        if len(raw) != _DATE_LENGTH + 1 or raw[-1:] != b",":
+            return None
+        try:
+            return raw[:_DATE_LENGTH].decode('ascii')
+        except UnicodeDecodeError:
+            return None
+
+    @staticmethod
+    def _date_matches(date: str, filters: Dict[str, Any]) -> bool:
+        if 'month' in filters and not date.startswith(filters['month']):
+            return False
+        if 'date_start' in filters and date < filters['date_start']:
+            return False
+        if 'date_end' in filters and date > filters['date_end']:
+            return False
+        return True
+
+    # ---------- 查询 ----------
+
+    def iter_items(self, filters: Dict[str, Any], start: int = 0, newest_first: bool = False,
+                   stop: int = None):
+        """从行号 start 开始（newest_first 时从 start 之前往前）逐条产出满足条件的 (记录ID, 记录)
+
+        日期条件先比较行首字节，不满足的行不解码（被修改过的记录按补丁内容判断）。
+        """
+        date_keys = {k: v for k, v in filters.items() if k in DATE_FILTER_KEYS}
+        patches = self._patches
+        if newest_first:
+            positions = range(start - 1, -1, -1)
+        else:
+            positions = range(start, len(self._starts) if stop is None else min(stop, len(self._starts)))
+        deleted = self._deleted
+        for pos in positions:
+            if date_keys:
+                date = self._raw_date(pos)
+                if (date is not None and not self._date_matches(date, date_keys)
+                        and (not patches or self.record_id(pos) not in patches)):
+                    continue
+            record_id, record = self.item(pos)
+            if record_id not in deleted and match_filters(record, filters):
+                yield record_id, record
+
+    def page_items(self, filters: Dict[str, Any], after_id: int = None, limit: int = 20,
+                   newest_first: bool = False) -> List[Tuple[int, OvertimeRecord]]:
+        """游标分页：二分定位游标所在行，只解析本页用到的行"""
+        if after_id is None:
+            start = len(self._starts) if newest_first else 0
+        elif newest_first:
+            start = self.position_after(after_id - 1)
+        else:
+            start = self.position_after(after_id)
+        return list(islice(self.iter_items(filters, start, newest_first), limit))
+
+    def count_live(self) -> int:
+        """有效记录数：行数减去墓碑数（墓碑只会指向文件中已有的记录）"""
+        max_id = self.max_id()
+        return len(self._starts) - sum(1 for record_id in self._deleted if record_id <= max_id)
+
+    def _hole_positions(self) -> List[int]:
+        """墓碑所在行号（升序），按操作日志缓存"""
+        if self._holes is None:
+            holes = []
+            for record_id in self._deleted:
+                pos = self.position_after(record_id - 1)
+                if pos < len(self._starts) and self.record_id(pos) == record_id:
+                    holes.append(pos)
+            self._holes = sorted(holes)
+        return self._holes
+
+    def slice_items(self, offset: int = 0, limit: int = None) -> List[Tuple[int, OvertimeRecord]]:
+        """无筛选条件时按位置取一页：第 offset 条有效记录起的 limit 条"""
+        pos = offset
+        for hole in self._hole_positions():
+            if hole > pos:
+                break
+            pos += 1
+        items = []
+        deleted = self._deleted
+        while pos < len(self._starts) and (limit is None or len(items) < limit):
+            item = self.item(pos)
+            if item[0] not in deleted:
+                items.append(item)
+            pos += 1
+        return items
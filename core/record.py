@@ -0,0 +1,203 @@
+# core/record.py
+import sys
+import threading
+from datetime import date as _date
+from typing import List
+
+
+class Codebook:
+    """字符串类别 <-> 小整数编码（未知类别自动追加，保证可还原）"""
+
+    def __init__(self, names: List[str]):
+        self.names = []
+        self._codes = {}
+        self._lock = threading.Lock()
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(name)
+                if code is None:
+                    code = len(self.names)
+                    self.names.append(sys.intern(name))
+                    self._codes[name] = code
+        return code
+
+    def find(self, name: str):
+        """查找已有编码，未知类别返回None（不追加）"""
+        return self._codes.get(name)
+
+    def name(self, code: int) -> str:
+        return self.names[code]
+
+
+# 日期类型 / 请假类型
+DAY_TYPES = Codebook(["工作日", "休息日", "节假日", "调休日"])
+LEAVE_TYPES = Codebook(["无", "事假", "病假", "年假", "婚假", "产假"])
+
+# 日期字符串共享表：同一天的记录共用一个字符串对象和序数
+_DATES = {}
+
+
+def _parse_date(text: str):
+    """返回 (共享的日期字符串, 日期序数)，格式不规范时序数为0"""
+    entry = _DATES.get(text)
+    if entry is None:
+        ordinal = 0
+        if len(text) == 10 and text[4] == "-" and text[7] == "-":
+            try:
+                ordinal = _date(int(text[:4]), int(text[5:7]), int(text[8:10])).toordinal()
+            except ValueError:
+                pass
+        entry = (sys.intern(text), ordinal)
+        _DATES[entry[0]] = entry
+    return entry
+
+
+def _format_hours(hours: float) -> str:
+    return "%g" % hours
+
+
+def _format_salary(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}元"
+
+
+# 时长/工资文本的解析结果缓存（取值种类很少），超过上限后不再缓存新值
+_PARSE_CACHE_LIMIT = 10000
+_HOURS = {}
+_SALARIES = {}
+
+
+def _parse_hours(text: str):
+    """返回 (时长, 需保留的原文或None)；无法解析（如"无"）时按0计"""
+    entry = _HOURS.get(text)
+    if entry is None:
+        try:
+            hours = float(text)
+        except ValueError:
+            hours = 0.0
+        entry = (hours, None if _format_hours(hours) == text else sys.intern(text))
+        if len(_HOURS) < _PARSE_CACHE_LIMIT:
+            _HOURS[text] = entry
+    return entry
+
+
+def _parse_salary(text: str):
+    """返回 (工资分, 需保留的原文或None)："400.00元" -> 40000"""
+    entry = _SALARIES.get(text)
+    if entry is None:
+        try:
+            cents = round(float(text.replace("元", "")) * 100)
+        except (ValueError, OverflowError):
+            cents = 0
+        entry = (cents, None if _format_salary(cents) == text else sys.intern(text))
+        if len(_SALARIES) < _PARSE_CACHE_LIMIT:
+            _SALARIES[text] = entry
+    return entry
+
+
+class OvertimeRecord:
+    """一条加班记录：加载时一次性解析字段
+
+    日期解析为序数，时长解析为浮点数，工资解析为整数分，类型/请假类型编码为小整数。
+    同时兼容原来的 List[str] 用法（下标、切片、len、迭代），
+    下标取值总是返回与原CSV完全一致的字符串。
+    """
+
+    __slots__ = ("date", "ordinal", "user", "type_code", "hours", "_hours_text",
+                 "leave_code", "leave_hours", "submit_time", "salary_cents", "_salary_text")
+
+    WIDTH = 8
+    _DEFAULTS = ["", "", "", "", "无", "无", "", ""]
+
+    def __init__(self, date="", user="", day_type="", hours="", leave_type="",
+                 leave_hours="", submit_time="", salary=""):
+        self.date, self.ordinal = _parse_date(date)
+        self.user = sys.intern(user)
+        self.type_code = DAY_TYPES.code(day_type)
+        self.leave_code = LEAVE_TYPES.code(leave_type)
+        self.leave_hours = sys.intern(leave_hours)
+        self.submit_time = submit_time
+        self.hours, self._hours_text = _parse_hours(hours)
+        self.salary_cents, self._salary_text = _parse_salary(salary)
+
+    @classmethod
+    def from_row(cls, row) -> "OvertimeRecord":
+        """从CSV行构建（补齐/截断为8列）"""
+        if isinstance(row, cls):
+            return row
+        values = [str(v) if v is not None else "" for v in list(row)[:cls.WIDTH]]
+        # 缺少的列按原有约定补齐：请假类型/请假时长缺省为"无"
+        values.extend(cls._DEFAULTS[len(values):])
+        return cls(*values)
+
+    # ---------- 解析后的字段 ----------
+
+    @property
+    def day_type(self) -> str:
+        return DAY_TYPES.names[self.type_code]
+
+    @property
+    def leave_type(self) -> str:
+        return LEAVE_TYPES.names[self.leave_code]
+
+    @property
+    def is_leave(self) -> bool:
+        return self.leave_code != 0
+
+    @property
+    def salary(self) -> float:
+        """加班工资（元）"""
+        return self.salary_cents / 100
+
+    # ---------- List[str] 兼容视图 ----------
+
+    def _field(self, index: int) -> str:
+        if index == 0:
+            return self.date
+        if index == 1:
+            return self.user
+        if index == 2:
+            return DAY_TYPES.names[self.type_code]
+        if index == 3:
+            return self._hours_text if self._hours_text is not None else _format_hours(self.hours)
+        if index == 4:
+            return LEAVE_TYPES.names[self.leave_code]
+        if index == 5:
+            return self.leave_hours
+        if index == 6:
+            return self.submit_time
+        if index == 7:
+            return self._salary_text if self._salary_text is not None else _format_salary(self.salary_cents)
+        raise IndexError("记录下标越界")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._field(i) for i in range(*index.indices(self.WIDTH))]
+        if index < 0:
+            index += self.WIDTH
+        return self._field(index)
+
+    def __len__(self):
+        return self.WIDTH
+
+    def __iter__(self):
+        return (self._field(i) for i in range(self.WIDTH))
+
+    def to_list(self) -> List[str]:
+        return [self._field(i) for i in range(self.WIDTH)]
+
+    def __eq__(self, other):
+        if isinstance(other, (OvertimeRecord, list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"OvertimeRecord({self.to_list()!r})"
@@ -0,0 +1,92 @@
+# core/row_index.py
+import json
+import base64
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, List, Tuple
+
+
+class RowIndex:
+    """行位置索引：按写入顺序（即记录ID升序）排列的有效记录ID
+
+    行位置 <-> 记录ID 可互查：游标分页用 bisect 从上一页最后一条记录处继续，O(log n + 页大小)。
+    """
+
+    def __init__(self):
+        self.ids: List[int] = []
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[int, List[str]]]) -> "RowIndex":
+        index = cls()
+        index.ids = sorted(record_id for record_id, _ in items)
+        return index
+
+    def _position(self, record_id: int) -> int:
+        """记录ID所在的行位置，不存在时返回-1"""
+        pos = bisect_left(self.ids, record_id)
+        if pos < len(self.ids) and self.ids[pos] == record_id:
+            return pos
+        return -1
+
+    def append(self, items: Iterable[Tuple[int, List[str]]]):
+        for record_id, _ in items:
+            if not self.ids or record_id > self.ids[-1]:
+                self.ids.append(record_id)
+            elif self._position(record_id) < 0:
+                insort(self.ids, record_id)
+
+    def update(self, record_id: int, record):
+        """修改不改变行位置"""
+
+    def delete(self, record_id: int):
+        pos = self._position(record_id)
+        if pos >= 0:
+            del self.ids[pos]
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def encode_cursor(record_id: int) -> str:
+    """生成不透明游标（记录上一页最后一条记录ID）"""
+    raw = json.dumps({"v": 1, "id": record_id}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """解析游标，空游标返回None；格式错误抛出 ValueError"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw.decode('utf-8'))
+        record_id = data["id"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+    if data.get("v") != 1 or not isinstance(record_id, int):
+        raise ValueError(f"无效的分页游标: {cursor}")
+    return record_id
+
+
+def scan_page(ids: List[int], after_id, limit: int, newest_first: bool, get_record, predicate=None):
+    """从游标位置开始在有序ID列表上取一页 [(记录ID, 记录)]
+
+    after_id 为上一页最后一条记录ID（None 表示从头/从最新开始）；
+    predicate 为其余筛选条件，不满足的记录跳过。
+    """
+    if newest_first:
+        start = bisect_left(ids, after_id) if after_id is not None else len(ids)
+        positions = range(start - 1, -1, -1)
+    else:
+        start = bisect_right(ids, after_id) if after_id is not None else 0
+        positions = range(start, len(ids))
+
+    items = []
+    for pos in positions:
+        record_id = ids[pos]
+        record = get_record(record_id)
+        if predicate is not None and not predicate(record):
+            continue
+        items.append((record_id, record))
+        if len(items) >= limit:
+            break
+    return items
@@ -0,0 +1,750 @@
+# core/storage.py
+import os
+import csv
+import heapq
+import json
+import sqlite3
+import threading
+import zipfile
+from typing import List, Tuple, Dict, Any
+from core.file_lock import FileLock
+from core.record import OvertimeRecord
+from core.row_index import scan_page
+
+# 记录字段（与CSV列顺序一致）
+RECORD_COLUMNS = ["date", "user", "type", "hours", "leave_type", "leave_hours", "submit_time", "salary"]
+# 记录字段数（不含ID列）和CSV数据文件表头（最后一列为记录ID）
+RECORD_WIDTH = len(RECORD_COLUMNS)
+CSV_HEADER = ["日期", "用户", "类型", "加班时长", "请假类型", "请假时长", "提交时间", "加班工资", "记录ID"]
+
+
+def header_has_ids(header) -> bool:
+    """表头第9列是否为记录ID列（旧数据只有8列，或第9列是手工加的其他内容）"""
+    return len(header) > RECORD_WIDTH and header[RECORD_WIDTH].strip() == CSV_HEADER[RECORD_WIDTH]
+
+
+def stored_record_id(row, id_limit: int):
+    """行中记录ID列的值，不是正整数或超过 id_limit 时返回None（按旧数据以行号分配ID）
+
+    程序写入的ID逐行递增：第n行的ID不超过此前的最大ID（含操作日志记录的已分配最大ID）+ n。
+    超出的值（如误填的手机号）不当作ID，否则之后分配的ID会跳到该值之后。
+    """
+    if len(row) > RECORD_WIDTH:
+        value = row[RECORD_WIDTH]
+        if value.isascii() and value.isdigit() and 0 < int(value) <= id_limit:
+            return int(value)
+    return None
+
+
+def _normalize_record(record) -> List[str]:
+    """补齐/截断为8列字符串"""
+    row = [str(v) if v is not None else "" for v in list(record)[:RECORD_WIDTH]]
+    row.extend([""] * (RECORD_WIDTH - len(row)))
+    return row
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """前缀查询的上界：date >= prefix AND date < 上界 等价于 startswith(prefix)"""
+    return prefix + "\U0010ffff"
+
+
+class RecordStorage:
+    """存储引擎基类，接口与 DataManager 的记录读写方法保持一致"""
+
+    def add_record(self, record: List[str]) -> bool:
+        raise NotImplementedError
+
+    def add_records(self, records: List[List[str]], sync=False) -> bool:
+        raise NotImplementedError
+
+    def get_all_records(self) -> List[List[str]]:
+        raise NotImplementedError
+
+    def get_all_records_with_ids(self) -> List[Tuple[int, List[str]]]:
+        raise NotImplementedError
+
+    def delete_record(self, record_id: int) -> bool:
+        raise NotImplementedError
+
+    def update_record(self, record_id: int, fields: Dict[str, str]) -> bool:
+        raise NotImplementedError
+
+    def get_monthly_records(self, month: str) -> List[List[str]]:
+        return [r for r in self.get_all_records() if r and r[0].startswith(month)]
+
+    def get_filtered_records(self, filters: Dict[str, Any], limit: int = None,
+                             offset: int = 0) -> Tuple[List[List[str]], int]:
+        filtered = [r for r in self.get_all_records() if match_filters(r, filters)]
+        return page_slice(filtered, limit, offset), len(filtered)
+
+    def page_items(self, filters: Dict[str, Any], after_id: int = None, limit: int = 20,
+                   newest_first: bool = False) -> List[Tuple[int, List[str]]]:
+        """游标分页：从 after_id 之后（newest_first 时为之前）取最多 limit 条 (记录ID, 记录)"""
+        records = dict(item for item in self.get_all_records_with_ids() if match_filters(item[1], filters))
+        return scan_page(sorted(records), after_id, limit, newest_first, records.__getitem__)
+
+    def count(self):
+        """不读取记录即可得到的记录总数，得不到时返回None"""
+        return None
+
+    def iter_records(self, filters: Dict[str, Any] = None):
+        """逐条产出满足条件的 (记录ID, 记录)，按写入顺序"""
+        filters = filters or {}
+        for record_id, record in self.get_all_records_with_ids():
+            if match_filters(record, filters):
+                yield record_id, record
+
+    def migrate_from_csv(self, items: List[Tuple[int, List[str]]]) -> int:
+        raise NotImplementedError
+
+    # 备份文件扩展名
+    BACKUP_SUFFIX = ".csv"
+
+    def backup(self, backup_file: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def page_slice(records: list, limit: int = None, offset: int = 0) -> list:
+    """按 limit/offset 截取一页（limit 为 None 时取到末尾）"""
+    if limit is None:
+        return records[offset:] if offset else records
+    return records[offset:offset + limit]
+
+
+def match_filters(record: List[str], filters: Dict[str, Any]) -> bool:
+    """判断单条记录是否满足筛选条件"""
+    if 'user' in filters and filters['user'] not in record[1]:
+        return False
+    if 'month' in filters and not record[0].startswith(filters['month']):
+        return False
+    if 'date_start' in filters and record[0] < filters['date_start']:
+        return False
+    if 'date_end' in filters and record[0] > filters['date_end']:
+        return False
+    if 'type' in filters and record[2] != filters['type']:
+        return False
+    return True
+
+
+class SqliteStorage(RecordStorage):
+    """SQLite 存储引擎"""
+
+    BACKUP_SUFFIX = ".db"
+
+    # 用户包含匹配展开为 IN 列表的上限（SQLite 变量个数有限制）
+    MAX_IN_USERS = 500
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        # GUI线程和Web服务线程共用一个连接，由 _lock 串行化访问
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """建表和索引"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    user TEXT NOT NULL,
+                    type TEXT NOT NULL DEFAULT '',
+                    hours TEXT NOT NULL DEFAULT '',
+                    leave_type TEXT NOT NULL DEFAULT '',
+                    leave_hours TEXT NOT NULL DEFAULT '',
+                    submit_time TEXT NOT NULL DEFAULT '',
+                    salary TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_date ON records(date)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_user_date ON records(user, date)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_type ON records(type)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _insert_many(self, records) -> int:
+        placeholders = ",".join("?" * len(RECORD_COLUMNS))
+        cursor = self._conn.executemany(
+            f"INSERT INTO records ({','.join(RECORD_COLUMNS)}) VALUES ({placeholders})",
+            (_normalize_record(r) for r in records if r)
+        )
+        return cursor.rowcount
+
+    def _select(self, where: str = "", params: tuple = (), limit: int = None,
+                offset: int = 0) -> List[List[str]]:
+        sql = f"SELECT {','.join(RECORD_COLUMNS)} FROM records"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params = tuple(params) + (-1 if limit is None else limit, offset)
+        with self._lock:
+            return [OvertimeRecord.from_row(row) for row in self._conn.execute(sql, params)]
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def add_record(self, record: List[str]) -> bool:
+        """添加一条记录"""
+        return self.add_records([record])
+
+    def add_records(self, records: List[List[str]], sync=False) -> bool:
+        """在一个事务中批量添加记录，失败时整体回滚；sync 时提交即落盘"""
+        with self._lock:
+            try:
+                if sync:
+                    self._conn.execute("PRAGMA synchronous=FULL")
+                with self._conn:
+                    self._insert_many(records)
+                return True
+            except sqlite3.Error as e:
+                print(f"✗ 批量添加记录失败，已回滚: {e}")
+                return False
+            finally:
+                if sync:
+                    self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def get_all_records(self) -> List[List[str]]:
+        """按写入顺序获取所有记录"""
+        return self._select()
+
+    def get_all_records_with_ids(self) -> List[Tuple[int, List[str]]]:
+        """按写入顺序获取所有记录及其ID"""
+        sql = f"SELECT id,{','.join(RECORD_COLUMNS)} FROM records ORDER BY id"
+        with self._lock:
+            return [(row[0], OvertimeRecord.from_row(row[1:])) for row in self._conn.execute(sql)]
+
+    def delete_record(self, record_id: int) -> bool:
+        """删除记录"""
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute("DELETE FROM records WHERE id = ?", (record_id,))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"✗ 删除记录失败: {e}")
+            return False
+
+    def update_record(self, record_id: int, fields: Dict[str, str]) -> bool:
+        """修改记录的部分字段"""
+        unknown = [k for k in fields if k not in RECORD_COLUMNS]
+        if unknown:
+            print(f"✗ 未知字段: {unknown}")
+            return False
+        if not fields:
+            return True
+
+        assignments = ",".join(f"{key} = ?" for key in fields)
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(
+                    f"UPDATE records SET {assignments} WHERE id = ?",
+                    tuple(str(v) for v in fields.values()) + (record_id,)
+                )
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"✗ 修改记录失败: {e}")
+            return False
+
+    def get_monthly_records(self, month: str) -> List[List[str]]:
+        """获取某月记录（走 date 索引的范围查询）"""
+        return self._select("date >= ? AND date < ?", (month, _prefix_upper_bound(month)))
+
+    def get_filtered_records(self, filters: Dict[str, Any], limit: int = None,
+                             offset: int = 0) -> Tuple[List[List[str]], int]:
+        """获取筛选后的记录，语义与CSV实现一致（用户为包含匹配）
+
+        limit/offset 交给 SQL 分页，总数用 COUNT(*) 单独统计。
+        """
+        conditions = self._filter_clauses(filters)
+        if conditions is None:
+            return [], 0
+        clauses, params = conditions
+
+        where = " AND ".join(clauses)
+        records = self._select(where, tuple(params), limit=limit, offset=offset)
+        if limit is None and not offset:
+            return records, len(records)
+
+        sql = "SELECT COUNT(*) FROM records" + (f" WHERE {where}" if where else "")
+        with self._lock:
+            total = self._conn.execute(sql, tuple(params)).fetchone()[0]
+        return records, total
+
+    def _filter_clauses(self, filters: Dict[str, Any]):
+        """把筛选条件转换为 (WHERE 子句列表, 参数)；没有匹配的用户时返回None"""
+        clauses = []
+        params = []
+
+        if 'user' in filters:
+            # 先在去重后的用户名上做包含匹配，再用 (user, date) 索引取记录
+            with self._lock:
+                users = [row[0] for row in self._conn.execute(
+                    "SELECT DISTINCT user FROM records WHERE instr(user, ?) > 0", (filters['user'],))]
+            if not users:
+                return None
+            if len(users) <= self.MAX_IN_USERS:
+                clauses.append(f"user IN ({','.join('?' * len(users))})")
+                params.extend(users)
+            else:
+                clauses.append("instr(user, ?) > 0")
+                params.append(filters['user'])
+
+        if 'month' in filters:
+            clauses.append("date >= ? AND date < ?")
+            params.extend([filters['month'], _prefix_upper_bound(filters['month'])])
+        if 'date_start' in filters:
+            clauses.append("date >= ?")
+            params.append(filters['date_start'])
+        if 'date_end' in filters:
+            clauses.append("date <= ?")
+            params.append(filters['date_end'])
+
+        if 'type' in filters:
+            clauses.append("type = ?")
+            params.append(filters['type'])
+
+        return clauses, params
+
+    def page_items(self, filters: Dict[str, Any], after_id: int = None, limit: int = 20,
+                   newest_first: bool = False) -> List[Tuple[int, List[str]]]:
+        """游标分页：按主键 id 做键集分页（WHERE id > ? ORDER BY id LIMIT ?）"""
+        conditions = self._filter_clauses(filters)
+        if conditions is None:
+            return []
+        clauses, params = conditions
+        if after_id is not None:
+            clauses.append("id < ?" if newest_first else "id > ?")
+            params.append(after_id)
+
+        sql = f"SELECT id,{','.join(RECORD_COLUMNS)} FROM records"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY id {'DESC' if newest_first else 'ASC'} LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params) + (limit,)).fetchall()
+        return [(row[0], OvertimeRecord.from_row(row[1:])) for row in rows]
+
+    # 流式读取时每批取出的记录数
+    ITER_BATCH_SIZE = 1000
+
+    def iter_records(self, filters: Dict[str, Any] = None):
+        """按主键分批取出记录（WHERE id > ? LIMIT ?），每批之间不占用连接"""
+        conditions = self._filter_clauses(filters or {})
+        if conditions is None:
+            return
+        clauses, params = conditions
+        sql = f"SELECT id,{','.join(RECORD_COLUMNS)} FROM records WHERE " + " AND ".join(clauses + ["id > ?"])
+        sql += " ORDER BY id LIMIT ?"
+
+        after_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, tuple(params) + (after_id, self.ITER_BATCH_SIZE)).fetchall()
+            for row in rows:
+                yield row[0], OvertimeRecord.from_row(row[1:])
+            if len(rows) < self.ITER_BATCH_SIZE:
+                return
+            after_id = rows[-1][0]
+
+    def migrate_from_csv(self, items: List[Tuple[int, List[str]]]) -> int:
+        """一次性从CSV迁移记录（保留记录ID），已迁移过则跳过"""
+        if self.get_meta("migrated_from_csv"):
+            return 0
+
+        placeholders = ",".join("?" * (len(RECORD_COLUMNS) + 1))
+        with self._lock, self._conn:
+            imported = self._conn.executemany(
+                f"INSERT INTO records (id,{','.join(RECORD_COLUMNS)}) VALUES ({placeholders})",
+                ([record_id] + _normalize_record(record) for record_id, record in items)
+            ).rowcount
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_csv', '1')")
+        if imported:
+            print(f"✓ 已从CSV迁移 {imported} 条记录到SQLite")
+        return imported
+
+    def backup(self, backup_file: str):
+        """使用SQLite在线备份接口复制数据库"""
+        with self._lock:
+            target = sqlite3.connect(backup_file)
+            try:
+                self._conn.backup(target)
+            finally:
+                target.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PartitionedStorage(RecordStorage):
+    """按月分区的CSV存储：data/records/YYYY-MM.csv + manifest.json
+
+    月度查询只打开一个分区文件，日期范围筛选按分区裁剪；
+    清单中记下各分区的记录数和ID范围：全量读取按ID范围依次打开分区、按记录ID合并，
+    顺序与单文件CSV/SQLite一致；游标分页只打开可能落在本页的分区。
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    BACKUP_SUFFIX = ".zip"
+    OTHER_PARTITION = "other"  # 日期格式不规范的记录
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+        self.manifest_file = os.path.join(root_dir, self.MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(root_dir, "records.lock"))
+        # 分区缓存：{分区键: (文件签名, {记录ID: 记录})}
+        self._partition_cache = {}
+        self._manifest = self._load_manifest()
+
+    # ---------- manifest ----------
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ 分区清单读取失败，按分区文件重建: {e}")
+            else:
+                # 旧版本清单没有ID范围，读取分区补上
+                for key, entry in manifest["partitions"].items():
+                    if entry.get("count") and "min_id" not in entry:
+                        entry.update(self._partition_entry(self._read_partition(key)))
+                return manifest
+        return self._rebuild_manifest()
+
+    @staticmethod
+    def _partition_entry(records: Dict[int, List[str]]) -> Dict[str, int]:
+        """分区的清单条目：记录数和ID范围"""
+        if not records:
+            return {"count": 0}
+        return {"count": len(records), "min_id": min(records), "max_id": max(records)}
+
+    def _rebuild_manifest(self) -> Dict[str, Any]:
+        """根据目录中的分区文件重建清单"""
+        manifest = {"version": 1, "next_id": 1, "partitions": {}, "meta": {}}
+        for name in sorted(os.listdir(self.root_dir)):
+            if not name.endswith(".csv"):
+                continue
+            key = name[:-4]
+            records = self._read_partition(key)
+            manifest["partitions"][key] = self._partition_entry(records)
+            if records:
+                manifest["next_id"] = max(manifest["next_id"], max(records) + 1)
+        return manifest
+
+    def _save_manifest(self):
+        temp_file = self.manifest_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.manifest_file)
+
+    def get_meta(self, key: str, default=None):
+        return self._manifest.get("meta", {}).get(key, default)
+
+    def count(self) -> int:
+        """各分区记录数之和（取自清单）"""
+        with self._lock:
+            return sum(entry.get("count", 0) for entry in self._manifest["partitions"].values())
+
+    # ---------- 分区读写 ----------
+
+    @classmethod
+    def partition_key(cls, date_str: str) -> str:
+        """记录日期对应的分区键 YYYY-MM"""
+        key = (date_str or "")[:7]
+        if len(key) == 7 and key[4] == "-" and key[:4].isdigit() and key[5:].isdigit():
+            return key
+        return cls.OTHER_PARTITION
+
+    def _partition_file(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{key}.csv")
+
+    def _partition_keys(self) -> List[str]:
+        return sorted(self._manifest["partitions"])
+
+    def _read_partition(self, key: str) -> Dict[int, List[str]]:
+        """读取分区文件（按文件签名缓存）"""
+        path = self._partition_file(key)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._partition_cache.pop(key, None)
+            return {}
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        cached = self._partition_cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        records = {}
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # 跳过表头
+            for row in reader:
+                if len(row) > RECORD_WIDTH and row[RECORD_WIDTH].isdigit():
+                    records[int(row[RECORD_WIDTH])] = OvertimeRecord.from_row(row)
+        self._partition_cache[key] = (signature, records)
+        return records
+
+    def _write_partition(self, key: str, records: Dict[int, List[str]]):
+        """整体重写一个分区（删除/修改时使用）"""
+        path = self._partition_file(key)
+        temp_file = path + ".tmp"
+        with open(temp_file, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for record_id, record in records.items():
+                writer.writerow(list(record) + [str(record_id)])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, path)
+        self._partition_cache.pop(key, None)
+        self._manifest["partitions"][key] = self._partition_entry(records)
+
+    def _append_items(self, items: List[Tuple[int, List[str]]], sync=False):
+        """按分区追加 (ID, 记录)，任一分区写入失败时回滚所有分区"""
+        groups = {}
+        for record_id, record in items:
+            groups.setdefault(self.partition_key(record[0]), []).append((record_id, record))
+
+        written = []  # (路径, 写入前大小或None)
+        try:
+            for key, group in groups.items():
+                path = self._partition_file(key)
+                size_before = os.path.getsize(path) if os.path.exists(path) else None
+                written.append((path, size_before))
+                with open(path, 'a', newline='', encoding='utf-8-sig') as f:
+                    writer = csv.writer(f)
+                    if size_before is None:
+                        writer.writerow(CSV_HEADER)
+                    writer.writerows(list(record) + [str(record_id)] for record_id, record in group)
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+        except Exception:
+            for path, size_before in written:
+                try:
+                    if size_before is None:
+                        os.remove(path)
+                    else:
+                        os.truncate(path, size_before)
+                except OSError:
+                    pass
+            raise
+
+        for key, group in groups.items():
+            entry = self._manifest["partitions"].setdefault(key, {"count": 0})
+            ids = [i for i, _ in group]
+            if entry["count"]:
+                ids += [entry["min_id"], entry["max_id"]]
+            entry.update(count=entry["count"] + len(group), min_id=min(ids), max_id=max(ids))
+            self._manifest["next_id"] = max(self._manifest["next_id"], entry["max_id"] + 1)
+        self._save_manifest()
+
+    # ---------- RecordStorage 接口 ----------
+
+    def add_records(self, records: List[List[str]], sync=False) -> bool:
+        """批量添加记录，分配ID后写入各自的月分区"""
+        rows = [_normalize_record(r) for r in records if r]
+        try:
+            with self._lock, self._file_lock:
+                # 其他进程可能已写入，重新加载清单再分配ID
+                self._manifest = self._load_manifest()
+                first_id = self._manifest["next_id"]
+                self._append_items([(first_id + i, row) for i, row in enumerate(rows)], sync=sync)
+            return True
+        except Exception as e:
+            print(f"✗ 批量添加记录失败，已回滚: {e}")
+            return False
+
+    def add_record(self, record: List[str]) -> bool:
+        return self.add_records([record])
+
+    def iter_partition_items(self, keys: List[str] = None):
+        """按记录ID顺序产出各分区的 (ID, 记录)
+
+        分区按清单中的最小ID排序，待产出的最小ID超过下一个分区的最小ID时才打开该分区，
+        ID范围不重叠的分区（按时间顺序录入）同一时间只持有一个。
+        """
+        with self._lock:
+            partitions = self._manifest["partitions"]
+            pending = sorted(((partitions[key]["min_id"], key)
+                              for key in (keys if keys is not None else self._partition_keys())
+                              if partitions.get(key, {}).get("count")), reverse=True)
+        heap = []  # (记录ID, 记录, 该分区剩余记录的迭代器)
+        while heap or pending:
+            if pending and (not heap or pending[-1][0] < heap[0][0]):
+                with self._lock:
+                    items = iter(sorted(self._read_partition(pending.pop()[1]).items()))
+                first = next(items, None)
+                if first is not None:
+                    heapq.heappush(heap, (first[0], first[1], items))
+                continue
+            record_id, record, items = heap[0]
+            yield record_id, record
+            following = next(items, None)
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (following[0], following[1], items))
+
+    def get_all_records_with_ids(self) -> List[Tuple[int, List[str]]]:
+        return list(self.iter_partition_items())
+
+    def iter_records(self, filters: Dict[str, Any] = None):
+        """只打开可能命中的分区，同一时间只持有一个分区"""
+        filters = filters or {}
+        for record_id, record in self.iter_partition_items(self._keys_for(filters)):
+            if match_filters(record, filters):
+                yield record_id, record
+
+    def get_all_records(self) -> List[List[str]]:
+        return [record for _, record in self.iter_partition_items()]
+
+    def get_monthly_records(self, month: str) -> List[List[str]]:
+        """只打开与月份前缀重叠的分区"""
+        keys = [k for k in self._partition_keys() if k.startswith(month) or month.startswith(k)]
+        return [r for _, r in self.iter_partition_items(keys) if r[0].startswith(month)]
+
+    def _keys_for(self, filters: Dict[str, Any]) -> List[str]:
+        """按月份/日期范围裁剪出可能包含结果的分区"""
+        keys = self._partition_keys()
+        if 'month' in filters:
+            month = filters['month']
+            keys = [k for k in keys if k.startswith(month) or month.startswith(k)]
+        if 'date_start' in filters:
+            start = filters['date_start'][:7]
+            keys = [k for k in keys if k == self.OTHER_PARTITION or k >= start]
+        if 'date_end' in filters:
+            end = filters['date_end'][:7]
+            keys = [k for k in keys if k == self.OTHER_PARTITION or k <= end]
+        return keys
+
+    def get_filtered_records(self, filters: Dict[str, Any], limit: int = None,
+                             offset: int = 0) -> Tuple[List[List[str]], int]:
+        """按日期范围裁剪分区后逐条匹配（按记录ID顺序）"""
+        filtered = [r for _, r in self.iter_partition_items(self._keys_for(filters))
+                    if match_filters(r, filters)]
+        return page_slice(filtered, limit, offset), len(filtered)
+
+    def page_items(self, filters: Dict[str, Any], after_id: int = None, limit: int = 20,
+                   newest_first: bool = False) -> List[Tuple[int, List[str]]]:
+        """游标分页：按清单中的ID范围依次打开分区，合并后按记录ID取一页
+
+        分区按最小ID（newest_first 时按最大ID从大到小）排序；已凑满一页且下一个分区的ID
+        都排在本页之后时停止，结果顺序与单文件CSV/SQLite一致。
+        """
+        with self._lock:
+            entries = [(key, self._manifest["partitions"][key]) for key in self._keys_for(filters)]
+        if newest_first:
+            entries = [(key, entry) for key, entry in entries if entry.get("count")
+                       and (after_id is None or entry["min_id"] < after_id)]
+            entries.sort(key=lambda item: -item[1]["max_id"])
+        else:
+            entries = [(key, entry) for key, entry in entries if entry.get("count")
+                       and (after_id is None or entry["max_id"] > after_id)]
+            entries.sort(key=lambda item: item[1]["min_id"])
+
+        page = []
+        predicate = lambda record: match_filters(record, filters)
+        for key, entry in entries:
+            if page and len(page) >= limit and (entry["max_id"] < page[-1][0] if newest_first
+                                       else entry["min_id"] > page[-1][0]):
+                break
+            with self._lock:
+                records = self._read_partition(key)
+            items = scan_page(sorted(records), after_id, limit, newest_first, records.__getitem__, predicate)
+            page = sorted(page + items, key=lambda item: item[0], reverse=newest_first)[:limit]
+        return page
+
+    def _find_record(self, record_id: int):
+        for key in self._partition_keys():
+            records = self._read_partition(key)
+            if record_id in records:
+                return key, records
+        return None, None
+
+    def delete_record(self, record_id: int) -> bool:
+        """删除记录：只重写该记录所在的分区"""
+        try:
+            with self._lock, self._file_lock:
+                key, records = self._find_record(record_id)
+                if key is None:
+                    return False
+                records = dict(records)
+                del records[record_id]
+                self._write_partition(key, records)
+                self._save_manifest()
+            return True
+        except OSError as e:
+            print(f"✗ 删除记录失败: {e}")
+            return False
+
+    def update_record(self, record_id: int, fields: Dict[str, str]) -> bool:
+        """修改记录：日期跨月时移动到新分区"""
+        unknown = [k for k in fields if k not in RECORD_COLUMNS]
+        if unknown:
+            print(f"✗ 未知字段: {unknown}")
+            return False
+
+        try:
+            with self._lock, self._file_lock:
+                key, records = self._find_record(record_id)
+                if key is None:
+                    return False
+                record = _normalize_record(records[record_id])
+                for name, value in fields.items():
+                    record[RECORD_COLUMNS.index(name)] = str(value)
+
+                records = dict(records)
+                new_key = self.partition_key(record[0])
+                if new_key == key:
+                    records[record_id] = record
+                    self._write_partition(key, records)
+                    self._save_manifest()
+                else:
+                    del records[record_id]
+                    self._write_partition(key, records)
+                    self._append_items([(record_id, record)])
+            return True
+        except OSError as e:
+            print(f"✗ 修改记录失败: {e}")
+            return False
+
+    def migrate_from_csv(self, items: List[Tuple[int, List[str]]]) -> int:
+        """一次性把单文件CSV拆分到月分区，保留记录ID"""
+        if self.get_meta("migrated_from_csv"):
+            return 0
+
+        with self._lock, self._file_lock:
+            items = [(record_id, _normalize_record(record)) for record_id, record in items]
+            if items:
+                self._append_items(items, sync=True)
+            self._manifest.setdefault("meta", {})["migrated_from_csv"] = "1"
+            self._save_manifest()
+        if items:
+            print(f"✓ 已从CSV拆分 {len(items)} 条记录到 {len(self._manifest['partitions'])} 个月分区")
+        return len(items)
+
+    def backup(self, backup_file: str):
+        """把所有分区和清单打包为zip"""
+        with self._lock, self._file_lock:
+            with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for name in sorted(os.listdir(self.root_dir)):
+                    if name.endswith(".csv") or name == self.MANIFEST_NAME:
+                        zf.write(os.path.join(self.root_dir, name), name)
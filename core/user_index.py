@@ -0,0 +1,132 @@
+# core/user_index.py
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class ColumnIndex:
+    """单列倒排索引：字段值 -> 记录ID集合（精确匹配）"""
+
+    COLUMN = None  # 索引的列下标，由子类指定
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, None]] = {}  # 字段值 -> 记录ID集合
+        self._value_of: Dict[int, str] = {}              # 记录ID -> 字段值
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[int, List[str]]]):
+        index = cls()
+        index.append(items)
+        return index
+
+    def _value_added(self, value: str):
+        """出现新的字段值时调用（子类可维护额外结构）"""
+
+    def _value_removed(self, value: str):
+        """字段值的最后一条记录被移除时调用"""
+
+    def append(self, items: Iterable[Tuple[int, List[str]]]):
+        """追加 (记录ID, 记录)；已存在的ID视为修改"""
+        column = self.COLUMN
+        for record_id, record in items:
+            value = record[column]
+            old_value = self._value_of.get(record_id)
+            if old_value == value:
+                continue
+            if old_value is not None:
+                self.delete(record_id)
+            self._value_of[record_id] = value
+            postings = self._postings.get(value)
+            if postings is None:
+                postings = self._postings[value] = {}
+                self._value_added(value)
+            postings[record_id] = None
+
+    def update(self, record_id: int, record):
+        self.append([(record_id, record)])
+
+    def delete(self, record_id: int):
+        value = self._value_of.pop(record_id, None)
+        if value is None:
+            return
+        postings = self._postings[value]
+        postings.pop(record_id, None)
+        if not postings:
+            del self._postings[value]
+            self._value_removed(value)
+
+    def __len__(self):
+        return len(self._value_of)
+
+    def count(self, value: str) -> int:
+        """精确匹配的记录数（不取出记录ID）"""
+        return len(self._postings.get(value, ()))
+
+    def ids_for(self, value: str) -> List[int]:
+        """精确匹配：记录ID（按ID升序，即写入顺序）"""
+        return sorted(self._postings.get(value, ()))
+
+
+class TypeIndex(ColumnIndex):
+    """类型索引：工作日/休息日/节假日/调休日 -> 记录ID"""
+
+    COLUMN = 2
+
+
+class UserIndex(ColumnIndex):
+    """用户二级索引：用户 -> 记录ID 倒排表（精确匹配）+ 用户名 n-gram 索引（包含匹配）
+
+    n-gram 取单字和相邻两字：单字查询直接命中，多字查询对各两字片段的用户集合求交集后
+    再用 in 校验，只需检查少量候选用户，而不是扫描全部记录。
+    """
+
+    COLUMN = 1
+
+    def __init__(self):
+        super().__init__()
+        self._grams: Dict[str, Set[str]] = {}  # n-gram -> 用户集合
+
+    @staticmethod
+    def _ngrams(user: str) -> Set[str]:
+        grams = set(user)
+        grams.update(user[i:i + 2] for i in range(len(user) - 1))
+        return grams
+
+    def _value_added(self, user: str):
+        for gram in self._ngrams(user):
+            self._grams.setdefault(gram, set()).add(user)
+
+    def _value_removed(self, user: str):
+        for gram in self._ngrams(user):
+            users = self._grams.get(gram)
+            if users is not None:
+                users.discard(user)
+                if not users:
+                    del self._grams[gram]
+
+    def users_containing(self, text: str) -> List[str]:
+        """包含 text 的所有用户名"""
+        if not text:
+            return list(self._postings)
+        if len(text) == 1:
+            return list(self._grams.get(text, ()))
+
+        candidates = None
+        for i in range(len(text) - 1):
+            users = self._grams.get(text[i:i + 2])
+            if not users:
+                return []
+            candidates = set(users) if candidates is None else candidates & users
+            if not candidates:
+                return []
+        return [user for user in candidates if text in user]
+
+    def count_containing(self, text: str) -> int:
+        """包含匹配的记录数（只累加倒排表长度）"""
+        return sum(len(self._postings[user]) for user in self.users_containing(text))
+
+    def ids_containing(self, text: str) -> List[int]:
+        """包含匹配：用户名包含 text 的记录ID（按ID升序，即写入顺序）"""
+        ids = []
+        for user in self.users_containing(text):
+            ids.extend(self._postings[user])
+        ids.sort()
+        return ids
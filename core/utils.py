@@ -1,8 +1,12 @@
 # core/utils.py
+import codecs
 import socket
 import re
 from datetime import datetime
 
+# 数据文件可能使用的编码，按检测优先级排列
+CANDIDATE_ENCODINGS = ['utf-8', 'gbk', 'big5']
+
 def validate_date(date_string):
     """验证日期格式 YYYY-MM-DD"""
     try:
@@ -11,6 +15,26 @@ def validate_date(date_string):
     except ValueError:
         return False
 
+def detect_encoding(file_path, sample_size=65536):
+    """读取文件开头有限字节检测编码，无法识别返回None"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+        is_whole_file = not f.read(1)
+    return detect_encoding_from_bytes(sample, is_whole_file)
+
+def detect_encoding_from_bytes(sample: bytes, is_whole_file=True):
+    """根据字节样本检测编码；样本被截断时允许末尾出现不完整的多字节字符"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    for encoding in CANDIDATE_ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=is_whole_file)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
 def format_timestamp():
     """格式化当前时间"""
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,104 @@
+# core/writer.py
+import queue
+import threading
+import time
+from typing import Callable, List
+
+
+class _WriteRequest:
+    """一次写入请求，写入线程完成后通过 event 通知调用方"""
+
+    __slots__ = ("records", "event", "success")
+
+    def __init__(self, records: List[List[str]]):
+        self.records = records
+        self.event = threading.Event()
+        self.success = False
+
+
+class GroupCommitWriter:
+    """单一写入线程 + 组提交：所有写入经队列串行执行，
+    合并短时间窗口内到达的请求，一次写入、一次fsync后统一确认"""
+
+    # 一批最多合并的记录数
+    MAX_BATCH = 1000
+
+    def __init__(self, write_batch: Callable[[List[List[str]]], bool],
+                 window_ms: float = 5, max_batch: int = MAX_BATCH):
+        self.write_batch = write_batch
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="GroupCommitWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, records: List[List[str]]) -> bool:
+        """提交记录并阻塞等待，返回记录是否已落盘"""
+        if self._stopped:
+            return self.write_batch(records)
+
+        request = _WriteRequest(records)
+        self._queue.put(request)
+        request.event.wait()
+        return request.success
+
+    def stop(self):
+        """处理完队列中剩余的请求后停止写入线程"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _WriteRequest) -> List[_WriteRequest]:
+        """从第一个请求开始，收集窗口期内到达的其他请求"""
+        batch = [first]
+        size = len(first.records)
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    request = self._queue.get(timeout=timeout)
+                else:
+                    # 窗口已过（或未设置窗口）时只合并已在排队的请求
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # 停止信号放回队列，处理完本批次后再退出
+                self._queue.put(None)
+                break
+            batch.append(request)
+            size += len(request.records)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = self._collect(first)
+            records = [record for request in batch for record in request.records]
+            try:
+                success = self.write_batch(records)
+            except Exception as e:
+                print(f"✗ 组提交写入失败: {e}")
+                success = False
+
+            if success:
+                for request in batch:
+                    request.success = True
+            elif len(batch) > 1:
+                # 合并写入失败时逐个重试，避免一个请求的坏数据连累其他请求
+                for request in batch:
+                    try:
+                        request.success = self.write_batch(request.records)
+                    except Exception as e:
+                        print(f"✗ 写入失败: {e}")
+                        request.success = False
+
+            for request in batch:
+                request.event.set()
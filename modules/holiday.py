@@ -1,75 +1,370 @@
 # modules/holiday.py
 import json
 import os
-from datetime import datetime
+import struct
+import hashlib
+import importlib.util
+from calendar import monthrange
+from datetime import date, datetime
+
+# 编译缓存：魔数、版本、holiday.json 的 (mtime_ns, 大小, SHA-256)、年数，之后逐年存分类表
+_CACHE_MAGIC = b"OTHC"
+_CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct("<4sHqq32sH")
+
+# chinese_calendar 的节日名（英文）-> 与 holiday.json 一致的中文名
+_HOLIDAY_NAMES = {
+    "New Year's Day": "元旦",
+    "Spring Festival": "春节",
+    "Tomb-sweeping Day": "清明节",
+    "Labour Day": "劳动节",
+    "Dragon Boat Festival": "端午节",
+    "National Day": "国庆节",
+    "Mid-autumn Festival": "中秋节",
+    "Anti-Fascist 70th Day": "抗战胜利70周年纪念日",
+}
+
+# 农历节日的公历日期（春节即正月初一、端午、中秋），chinese_calendar 不提供农历换算，
+# 其节假日表也无法区分周末的法定日与补休日；用于确定法定节假日（detailsType=3）。
+# 须覆盖 chinese_calendar 有数据的所有年份（tests/test_holiday.py 检查），升级该库后在此补充
+_LUNAR_FESTIVALS = {
+    2004: ("01-22", "06-22", "09-28"), 2005: ("02-09", "06-11", "09-18"),
+    2006: ("01-29", "05-31", "10-06"), 2007: ("02-18", "06-19", "09-25"),
+    2008: ("02-07", "06-08", "09-14"), 2009: ("01-26", "05-28", "10-03"),
+    2010: ("02-14", "06-16", "09-22"), 2011: ("02-03", "06-06", "09-12"),
+    2012: ("01-23", "06-23", "09-30"), 2013: ("02-10", "06-12", "09-19"),
+    2014: ("01-31", "06-02", "09-08"), 2015: ("02-19", "06-20", "09-27"),
+    2016: ("02-08", "06-09", "09-15"), 2017: ("01-28", "05-30", "10-04"),
+    2018: ("02-16", "06-18", "09-24"), 2019: ("02-05", "06-07", "09-13"),
+    2020: ("01-25", "06-25", "10-01"), 2021: ("02-12", "06-14", "09-21"),
+    2022: ("02-01", "06-03", "09-10"), 2023: ("01-22", "06-22", "09-29"),
+    2024: ("02-10", "06-10", "09-17"), 2025: ("01-29", "05-31", "10-06"),
+    2026: ("02-17", "06-19", "09-25"),
+}
+
+
+def statutory_days(year: int, qingming: date = None) -> set:
+    """某年的法定节假日（《全国年节及纪念日放假办法》规定的放假日，加班按三倍工资）
+
+    只含办法规定的天数，与周末连休、调休出来的日子不算；qingming 为清明节气当天。
+    缺少该年农历节日日期时抛出 ValueError（不能把春节等按普通节假日计）。
+    """
+    days = {date(year, 1, 1)}
+    days.update(date(year, 10, day) for day in (1, 2, 3))
+    if year == 2015:
+        days.add(date(2015, 9, 3))  # 抗战胜利70周年纪念日
+    if year < 2008:
+        days.update(date(year, 5, day) for day in (1, 2, 3))
+    else:
+        days.update(date(year, 5, day) for day in ((1, 2) if year >= 2025 else (1,)))
+        if qingming is not None:
+            days.add(qingming)
+
+    festivals = _LUNAR_FESTIVALS.get(year)
+    if festivals is None:
+        raise ValueError(f"缺少 {year} 年农历节日日期，无法确定法定节假日，请在 _LUNAR_FESTIVALS 中补充")
+    spring, dragon_boat, mid_autumn = (date.fromisoformat(f"{year}-{day}") for day in festivals)
+    # 春节：2008-2013 年为除夕至初二，2025 年起为除夕至初三，其余为初一至初三
+    first = -1 if 2008 <= year <= 2013 or year >= 2025 else 0
+    last = 1 if 2008 <= year <= 2013 else 2
+    days.update(date.fromordinal(spring.toordinal() + offset) for offset in range(first, last + 1))
+    if year >= 2008:
+        days.update((dragon_boat, mid_autumn))
+    return days
+
+
+class YearCalendar:
+    """一年的日期分类表，按年内第几天（从0起）下标
+
+    每天只存 type、detailsType、当月工作日累计数 三个小整数（各一个 bytearray），
+    说明文字（工作日/休息日/节日名）去重后只存下标。
+    当月第几个工作日即当天的累计数（type=0 的日子，含调休上班的周末）。
+    """
+
+    __slots__ = ('year', 'first_ordinal', 'types', 'details', 'month_workdays',
+                 'des_index', 'descriptions')
+
+    # 序列化头：年份、天数、说明文字字节数
+    _HEADER = struct.Struct("<HHI")
+
+    def __init__(self, year: int):
+        self.year = year
+        self.first_ordinal = date(year, 1, 1).toordinal()
+        days = date(year, 12, 31).toordinal() - self.first_ordinal + 1
+        self.types = bytearray(days)
+        self.details = bytearray(days)
+        self.month_workdays = bytearray(days)
+        self.des_index = bytearray(days)
+        self.descriptions = []
+
+    def __len__(self):
+        return len(self.types)
+
+    def set(self, day: int, day_type: int, type_des: str, details_type: int):
+        if type_des not in self.descriptions:
+            self.descriptions.append(type_des)
+        self.types[day] = day_type
+        self.details[day] = details_type
+        self.des_index[day] = self.descriptions.index(type_des)
+
+    def month_bounds(self, month: int) -> tuple:
+        """某月在表中的下标范围 [start, end)"""
+        start = date(self.year, month, 1).toordinal() - self.first_ordinal
+        if month == 12:
+            return start, len(self)
+        return start, date(self.year, month + 1, 1).toordinal() - self.first_ordinal
+
+    def count_workdays(self):
+        """逐月累计工作日数，分类写完后调用一次"""
+        for month in range(1, 13):
+            start, end = self.month_bounds(month)
+            count = 0
+            for day in range(start, end):
+                if self.types[day] == 0:
+                    count += 1
+                self.month_workdays[day] = count
+
+    def pack(self) -> bytes:
+        """序列化：头 + 说明文字（\0分隔）+ 四个按日数组"""
+        names = "\0".join(self.descriptions).encode("utf-8")
+        return b"".join((self._HEADER.pack(self.year, len(self), len(names)), names,
+                         self.types, self.details, self.des_index, self.month_workdays))
+
+    @classmethod
+    def unpack(cls, data, offset: int = 0) -> tuple:
+        """从 data 的 offset 处反序列化，返回 (分类表, 下一个偏移)，数据不完整时抛出 ValueError"""
+        year, days, names_length = cls._HEADER.unpack_from(data, offset)
+        offset += cls._HEADER.size
+        calendar = cls(year)
+        if days != len(calendar) or offset + names_length + days * 4 > len(data):
+            raise ValueError(f"{year} 年分类表不完整")
+        names = bytes(data[offset:offset + names_length]).decode("utf-8")
+        calendar.descriptions = names.split("\0") if names else []
+        offset += names_length
+        for field in ('types', 'details', 'des_index', 'month_workdays'):
+            setattr(calendar, field, bytearray(data[offset:offset + days]))
+            offset += days
+        return calendar, offset
+
+    def get(self, day: int) -> tuple:
+        """第 day 天的 (type, typeDes, detailsType, indexWorkDayOfMonth)，非工作日序号为0"""
+        day_type = self.types[day]
+        return (day_type, self.descriptions[self.des_index[day]], self.details[day],
+                self.month_workdays[day] if day_type == 0 else 0)
+
+    def workday_indexes(self, month: int) -> list:
+        """某月每天的当月第几个工作日，非工作日为0"""
+        start, end = self.month_bounds(month)
+        return [count if day_type == 0 else 0
+                for day_type, count in zip(self.types[start:end], self.month_workdays[start:end])]
+
+
+class ChineseCalendarSource:
+    """chinese_calendar 数据源：首次用到时才导入，每年扫一遍节假日/调休表编译成 YearCalendar 并缓存"""
+
+    def __init__(self):
+        self.available = importlib.util.find_spec("chinese_calendar") is not None
+        self._module = None
+        self._years = None      # 库中有数据的年份范围 (最早, 最晚)
+        self._calendars = {}    # 年份 -> YearCalendar，无数据的年份为 None
+
+    def _load(self):
+        if self._module is None:
+            import chinese_calendar
+            self._module = chinese_calendar
+            self._years = (min(chinese_calendar.holidays).year, max(chinese_calendar.holidays).year)
+        return self._module
+
+    @staticmethod
+    def _holiday_name(name) -> str:
+        name = getattr(name, "value", name)  # 旧版本为枚举
+        return _HOLIDAY_NAMES.get(name, name)
+
+    def year_calendar(self, year: int):
+        """某年的分类表，库中没有该年数据时返回None"""
+        if year not in self._calendars:
+            self._calendars[year] = self._build(year)
+        return self._calendars[year]
+
+    def _build(self, year: int):
+        module = self._load()
+        if not self._years[0] <= year <= self._years[1]:
+            print(f"⚠ chinese_calendar 无 {year} 年数据，按星期判断")
+            return None
+
+        holidays, workdays, in_lieu_days = module.holidays, module.workdays, module.in_lieu_days
+        qingming = [day for day, name in module.get_solar_terms(date(year, 4, 1), date(year, 4, 10))
+                    if name == "清明"]
+        statutory = statutory_days(year, qingming[0] if qingming else None)
+        calendar = YearCalendar(year)
+        for day in range(len(calendar)):
+            day_obj = date.fromordinal(calendar.first_ordinal + day)
+            if day_obj in in_lieu_days:
+                # 调休放假的日子，与 holiday.json 一致按普通节假日
+                calendar.set(day, 2, self._holiday_name(holidays.get(day_obj)) or "调休", 2)
+            elif day_obj in workdays:
+                # 调休上班
+                calendar.set(day, 0, "工作日", 0)
+            elif day_obj in holidays:
+                name = self._holiday_name(holidays[day_obj]) or "节假日"
+                # 法定节假日三倍，连休的其余日子按普通节假日
+                calendar.set(day, 2, name, 3 if day_obj in statutory else 2)
+            elif day_obj.weekday() >= 5:
+                calendar.set(day, 1, "休息日", 1)
+            else:
+                calendar.set(day, 0, "工作日", 0)
+        calendar.count_workdays()
+        return calendar
+
 
 class HolidayChecker:
     """节假日检查器"""
 
     def __init__(self, config_manager):
         self.config_manager = config_manager
-        self.calendar_available = False
-        self.holiday_data = {}
-
-        # 检测 chinese_calendar
-        try:
-            import chinese_calendar
-            self.calendar_available = True
+        # (当前数据源, 按年编译的分类表)：数据源（内置数据 / chinese_calendar / 仅按星期）
+        # 在启动和 reload() 时按配置确定，查询时不再读取配置；整体替换，并发查询不会混用
+        self._active = (None, {})
+
+        # 检测 chinese_calendar（只查找不导入，用到时才导入）
+        self._chinese_calendar = ChineseCalendarSource()
+        self.calendar_available = self._chinese_calendar.available
+        if self.calendar_available:
             print("✓ chinese_calendar 已安装")
-        except ImportError:
+        else:
             print("⚠ chinese_calendar 未安装")
 
-        # 加载节假日JSON配置
-        config_file = os.path.join("modules", "holiday.json")
-        if os.path.exists(config_file):
+        # holiday.json 只编译分类所需字段并缓存为二进制；万年历等完整字段首次用到时才解析JSON
+        self.holiday_file = os.path.join("modules", "holiday.json")
+        self.cache_file = os.path.join("modules", "holiday.cache")
+        self._holiday_data = None
+        self._builtin_calendars = self._load_builtin_calendars()
+        self._active = (self._select_source(), {})
+
+    def reload(self):
+        """重新加载 holiday.json 并按配置重新选择数据源（保存设置或更新 holiday.json 后调用）"""
+        self._holiday_data = None
+        self._builtin_calendars = self._load_builtin_calendars()
+        self._active = (self._select_source(), {})
+
+    @property
+    def holiday_data(self) -> dict:
+        """holiday.json 的完整内容 {年份: {MM-DD: 字段}}，首次访问时解析"""
+        if self._holiday_data is None:
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # 🎯 检查是否是API响应格式（有code, msg, data字段）
-                if isinstance(data, dict) and "data" in data and "code" in data:
-                    print(f"检测到API响应格式，提取data字段")
-                    data = data["data"]
-
-                # 检测格式并转换
-                if isinstance(data, list) and len(data) > 0 and "days" in data[0]:
-                    # API格式：[{month: 1, year: 2026, days: [...]}]
-                    self.holiday_data = self._convert_api_format(data)
-                    print(f"✓ holiday.json API格式加载成功")
-                elif isinstance(data, dict) and any("month" in v for v in data.values() if isinstance(v, list)):
-                    # API格式：{"2026": [{month: 1, days: [...]}]}
-                    self.holiday_data = {}
-                    for year, months in data.items():
-                        self.holiday_data[year] = self._convert_api_format(months)
-                    print(f"✓ holiday.json API格式（按年）加载成功")
-                else:
-                    # 原始格式：{"2024": {"01-01": {...}}}
-                    self.holiday_data = data
-                    print(f"✓ holiday.json 原始格式加载成功")
-
-                # 打印支持的年份
-                if self.holiday_data:
-                    years = list(self.holiday_data.keys())
-                    print(f"支持年份: {years}")
-
-                    # 验证第一个年份的数据
-                    if years:
-                        first_year = years[0]
-                        if first_year in self.holiday_data:
-                            dates = list(self.holiday_data[first_year].keys())[:3]
-                            print(f"  {first_year} 示例日期: {dates}")
-                            # 打印第一个日期的详细信息
-                            if dates:
-                                first_date = dates[0]
-                                config = self.holiday_data[first_year][first_date]
-                                print(f"  {first_year}-{first_date}: type={config['type']}, detailsType={config['detailsType']}, typeDes={config['typeDes']}")
-
-            except Exception as e:
-                print(f"⚠ holiday.json 加载失败: {e}")
-                self.holiday_data = {}
+                with open(self.holiday_file, 'rb') as f:
+                    self._holiday_data = self._parse_holiday_json(f.read())
+            except OSError:
+                self._holiday_data = {}
+        return self._holiday_data
+
+    def _parse_holiday_json(self, raw: bytes) -> dict:
+        """解析 holiday.json（API格式 / 按年API格式 / 原始格式），失败返回空字典"""
+        holiday_data = {}
+        try:
+            data = json.loads(raw.decode('utf-8'))
+
+            # 🎯 检查是否是API响应格式（有code, msg, data字段）
+            if isinstance(data, dict) and "data" in data and "code" in data:
+                print(f"检测到API响应格式，提取data字段")
+                data = data["data"]
+
+            # 检测格式并转换
+            if isinstance(data, list) and len(data) > 0 and "days" in data[0]:
+                # API格式：[{month: 1, year: 2026, days: [...]}]
+                holiday_data = self._convert_api_format(data)
+                print(f"✓ holiday.json API格式加载成功")
+            elif isinstance(data, dict) and any("month" in v for v in data.values() if isinstance(v, list)):
+                # API格式：{"2026": [{month: 1, days: [...]}]}
+                for year, months in data.items():
+                    holiday_data[year] = self._convert_api_format(months)
+                print(f"✓ holiday.json API格式（按年）加载成功")
+            else:
+                # 原始格式：{"2024": {"01-01": {...}}}
+                holiday_data = data
+                print(f"✓ holiday.json 原始格式加载成功")
+
+            # 打印支持的年份
+            if holiday_data:
+                years = list(holiday_data.keys())
+                print(f"支持年份: {years}")
+
+                # 验证第一个年份的数据
+                first_year = years[0]
+                dates = list(holiday_data[first_year].keys())[:3]
+                print(f"  {first_year} 示例日期: {dates}")
+                # 打印第一个日期的详细信息
+                if dates:
+                    config = holiday_data[first_year][dates[0]]
+                    print(f"  {first_year}-{dates[0]}: type={config['type']}, detailsType={config['detailsType']}, typeDes={config['typeDes']}")
+
+        except Exception as e:
+            print(f"⚠ holiday.json 加载失败: {e}")
+            holiday_data = {}
+        return holiday_data
+
+    def _load_builtin_calendars(self) -> dict:
+        """取 holiday.json 各年的分类表：修改时间和大小与缓存一致时只读缓存，
+        不一致时按内容哈希判断，内容变化才重新解析JSON并编译
+        """
+        if not os.path.exists(self.holiday_file):
+            print(f"⚠ holiday.json 不存在: {self.holiday_file}")
+            self._holiday_data = {}
+            return {}
+
+        stat = os.stat(self.holiday_file)
+        cached = self._read_cache()
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            calendars = cached[3]
+            print(f"✓ holiday.json 编译缓存加载成功，支持年份: {sorted(calendars)}")
+            return calendars
+
+        with open(self.holiday_file, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).digest()
+        if cached is not None and cached[2] == digest:
+            calendars = cached[3]
         else:
-            print(f"⚠ holiday.json 不存在: {config_file}")
-            self.holiday_data = {}
+            self._holiday_data = self._parse_holiday_json(raw)
+            calendars = {int(year): self._compile_builtin_year(int(year), months)
+                         for year, months in self._holiday_data.items() if str(year).isdigit()}
+        self._write_cache(stat, digest, calendars)
+        return calendars
+
+    def _read_cache(self):
+        """读取编译缓存 (mtime_ns, 大小, SHA-256, {年份: 分类表})，不存在或损坏时返回None"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = f.read()
+            magic, version, mtime_ns, size, digest, count = _CACHE_HEADER.unpack_from(data, 0)
+            if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+                return None
+            calendars = {}
+            offset = _CACHE_HEADER.size
+            view = memoryview(data)
+            for _ in range(count):
+                calendar, offset = YearCalendar.unpack(view, offset)
+                calendars[calendar.year] = calendar
+            return mtime_ns, size, digest, calendars
+        except (OSError, struct.error, ValueError) as e:
+            if os.path.exists(self.cache_file):
+                print(f"⚠ holiday.cache 无效，重新编译: {e}")
+            return None
+
+    def _write_cache(self, stat, digest: bytes, calendars: dict):
+        """写编译缓存（先写临时文件再替换），目录不可写时只提示"""
+        temp_file = self.cache_file + ".tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, stat.st_mtime_ns,
+                                           stat.st_size, digest, len(calendars)))
+                for year in sorted(calendars):
+                    f.write(calendars[year].pack())
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            print(f"⚠ holiday.cache 写入失败: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
 
     def _convert_api_format(self, api_data):
         """转换API格式为内部格式"""
@@ -107,14 +402,78 @@ class HolidayChecker:
 
         return result
 
-    def get_holiday_info(self, date_str: str) -> dict:
-        """获取节假日详细信息"""
+    @staticmethod
+    def _parse_date(date_str: str) -> date:
+        """解析 YYYY-MM-DD，兼容不补零的月、日（如 2026-1-5）"""
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+    def _select_source(self) -> str:
+        """按配置选择数据源：builtin（holiday.json）/ chinese_calendar / weekday（仅按星期）"""
+        if self.config_manager.get('use_builtin_holiday', False) and self._builtin_calendars:
+            return "builtin"
+        if self.calendar_available:
+            return "chinese_calendar"
+        return "weekday"
+
+    def _year_calendar(self, year: int) -> YearCalendar:
+        """取某年的分类表，首次用到该年时才编译"""
+        source, calendars = self._active
+        calendar = calendars.get(year)
+        if calendar is None:
+            calendar = self._build_year(year, source)
+            calendars[year] = calendar
+        return calendar
+
+    def _build_year(self, year: int, source: str) -> YearCalendar:
+        """按数据源取一年的分类表
+
+        内置数据源下 holiday.json 中各年已在启动时编译好，chinese_calendar 各年由适配器编译，
+        其余年份按星期判断。
+        """
+        if source == "builtin" and year in self._builtin_calendars:
+            return self._builtin_calendars[year]
+        if source == "chinese_calendar":
+            calendar = self._chinese_calendar.year_calendar(year)
+            if calendar is not None:
+                return calendar
+        return self._compile_builtin_year(year, {})
+
+    @staticmethod
+    def _compile_builtin_year(year: int, year_data: dict) -> YearCalendar:
+        """按 holiday.json 中该年的数据 {MM-DD: 字段} 逐日分类，数据中没有的日子按星期判断"""
+        calendar = YearCalendar(year)
+        for day in range(len(calendar)):
+            day_obj = date.fromordinal(calendar.first_ordinal + day)
+            classified = None
+            config = year_data.get(f"{day_obj.month:02d}-{day_obj.day:02d}")
+            if config is not None:
+                classified = (config["type"], config["typeDes"], config["detailsType"])
+
+            if classified is None:
+                # 默认：检查周末
+                if day_obj.weekday() >= 5:
+                    classified = (1, "休息日", 1)
+                else:
+                    classified = (0, "工作日", 0)
+            calendar.set(day, *classified)
+        calendar.count_workdays()
+        return calendar
+
+    def _classify(self, day_obj: date) -> tuple:
+        """查表得到 (type, typeDes, detailsType, indexWorkDayOfMonth)"""
+        calendar = self._year_calendar(day_obj.year)
+        return calendar.get(day_obj.toordinal() - calendar.first_ordinal)
+
+    def get_holiday_info(self, date_str: str, almanac: bool = True) -> dict:
+        """获取节假日详细信息；almanac=False 时不读取 holiday.json 中的农历、宜忌等万年历字段"""
         try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+            date_obj = self._parse_date(date_str)
             year = date_obj.year
             month = date_obj.month
             day = date_obj.day
-            month_day = f"{month:02d}-{day:02d}"
 
             # 基础信息
             result = {
@@ -137,19 +496,13 @@ class HolidayChecker:
                 "indexWorkDayOfMonth": 0
             }
 
-            # 检查配置
-            use_builtin = self.config_manager.get('use_builtin_holiday', False)
+            (result["type"], result["typeDes"], result["detailsType"],
+             result["indexWorkDayOfMonth"]) = self._classify(date_obj)
 
-            if use_builtin and self.holiday_data:
-                year_str = str(year)
-
-                if year_str in self.holiday_data and month_day in self.holiday_data[year_str]:
-                    config = self.holiday_data[year_str][month_day]
-
-                    # 填充所有字段
-                    result["type"] = config["type"]
-                    result["typeDes"] = config["typeDes"]
-                    result["detailsType"] = config["detailsType"]
+            # 内置数据：补充万年历字段
+            if almanac and self._active[0] == "builtin" and year in self._builtin_calendars:
+                config = self.holiday_data.get(str(year), {}).get(f"{month:02d}-{day:02d}")
+                if config is not None:
                     result["chineseZodiac"] = config.get("chineseZodiac", "")
                     result["solarTerms"] = config.get("solarTerms", "")
                     result["lunarCalendar"] = config.get("lunarCalendar", "")
@@ -159,71 +512,6 @@ class HolidayChecker:
                     result["dayOfYear"] = config.get("dayOfYear", result["dayOfYear"])
                     result["weekOfYear"] = config.get("weekOfYear", result["weekOfYear"])
                     result["constellation"] = config.get("constellation", result["constellation"])
-                    result["indexWorkDayOfMonth"] = config.get("indexWorkDayOfMonth", 0)
-
-                    if config["type"] == 0 and result["indexWorkDayOfMonth"] == 0:
-                        result["indexWorkDayOfMonth"] = self._get_workday_index(date_obj)
-
-                    return result
-                else:
-                    # 未命中 - 默认判断
-                    is_weekend = date_obj.weekday() >= 5
-                    if is_weekend:
-                        result["type"] = 1
-                        result["typeDes"] = "休息日"
-                        result["detailsType"] = 1
-                    else:
-                        result["type"] = 0
-                        result["typeDes"] = "工作日"
-                        result["detailsType"] = 0
-                        result["indexWorkDayOfMonth"] = self._get_workday_index(date_obj)
-                    return result
-
-            # 未选择内置数据 - 使用chinese_calendar
-            if self.calendar_available:
-                try:
-                    import chinese_calendar as calendar
-
-                    is_holiday, holiday_name = calendar.get_holiday_detail(date_obj.date())
-                    is_in_lieu = calendar.is_in_lieu(date_obj.date())
-                    is_workday = calendar.is_workday(date_obj.date())
-
-                    if is_in_lieu:
-                        result["type"] = 1
-                        result["typeDes"] = holiday_name.value if holiday_name else "调休"
-                        result["detailsType"] = 1
-                        return result
-
-                    if is_holiday:
-                        result["type"] = 2
-                        result["typeDes"] = holiday_name.value if holiday_name else "节假日"
-                        if "国庆" in str(holiday_name) or "春节" in str(holiday_name):
-                            result["detailsType"] = 3
-                        else:
-                            result["detailsType"] = 2
-                        return result
-
-                    if is_workday:
-                        result["type"] = 0
-                        result["typeDes"] = "工作日"
-                        result["detailsType"] = 0
-                        result["indexWorkDayOfMonth"] = self._get_workday_index(date_obj)
-                        return result
-
-                except Exception as e:
-                    print(f"chinese_calendar调用失败: {e}")
-
-            # 默认：检查周末
-            is_weekend = date_obj.weekday() >= 5
-            if is_weekend:
-                result["type"] = 1
-                result["typeDes"] = "休息日"
-                result["detailsType"] = 1
-            else:
-                result["type"] = 0
-                result["typeDes"] = "工作日"
-                result["detailsType"] = 0
-                result["indexWorkDayOfMonth"] = self._get_workday_index(date_obj)
 
             return result
 
@@ -237,27 +525,34 @@ class HolidayChecker:
                 "constellation": "", "indexWorkDayOfMonth": 0
             }
 
-    def get_day_type(self, date_str: str) -> tuple:
-        """获取日期类型"""
-        info = self.get_holiday_info(date_str)
-
-        # 按detailsType分类：
-        # detailsType=0: 工作日
-        # detailsType=1: 休息日
-        # detailsType=2: 普通节假日 → 休息日
-        # detailsType=3: 三倍工资节假日 → 节假日
-
-        if info["detailsType"] == 0:
-            return ("工作日", info["typeDes"])
-        elif info["detailsType"] == 1:
-            return ("休息日", info["typeDes"])
-        elif info["detailsType"] == 2:
-            return ("休息日", f"{info['typeDes']}(普通节假日)")
-        elif info["detailsType"] == 3:
-            return ("节假日", f"{info['typeDes']}(三倍)")
+    @staticmethod
+    def _day_type(details_type: int, type_des: str) -> tuple:
+        """按detailsType分类：
+        detailsType=0: 工作日
+        detailsType=1: 休息日
+        detailsType=2: 普通节假日 → 休息日
+        detailsType=3: 三倍工资节假日 → 节假日
+        """
+        if details_type == 0:
+            return ("工作日", type_des)
+        elif details_type == 1:
+            return ("休息日", type_des)
+        elif details_type == 2:
+            return ("休息日", f"{type_des}(普通节假日)")
+        elif details_type == 3:
+            return ("节假日", f"{type_des}(三倍)")
         else:
             return ("未知", "未知")
 
+    def get_day_type(self, date_str: str) -> tuple:
+        """获取日期类型：直接查编译好的分类表，不构造完整信息"""
+        try:
+            _, type_des, details_type, _ = self._classify(self._parse_date(date_str))
+        except Exception as e:
+            print(f"⚠ 获取节假日信息失败: {e}")
+            return ("工作日", "未知")
+        return self._day_type(details_type, type_des)
+
     def _get_constellation(self, month: int, day: int) -> str:
         """获取星座"""
         if (month == 3 and day >= 21) or (month == 4 and day <= 19):
@@ -285,37 +580,40 @@ class HolidayChecker:
         else:
             return "双鱼座"
 
-    def _get_workday_index(self, date_obj: datetime) -> int:
-        """获取当月第几个工作日"""
-        year = date_obj.year
-        month = date_obj.month
-        workday_count = 0
+    def get_day_types(self, start, end) -> list:
+        """一次判断 [start, end]（含两端，字符串或日期）内每一天，跨年时逐年查表
+
+        返回 [{"date", "type", "reason", "detailsType", "indexWorkDayOfMonth"}]，
+        type / reason 与 get_day_type 相同。
+        """
+        start = start if isinstance(start, date) else self._parse_date(start)
+        end = end if isinstance(end, date) else self._parse_date(end)
+        result = []
+        ordinal, last = start.toordinal(), end.toordinal()
+        while ordinal <= last:
+            calendar = self._year_calendar(date.fromordinal(ordinal).year)
+            first = calendar.first_ordinal
+            stop = min(last, first + len(calendar) - 1)
+            for day in range(ordinal - first, stop - first + 1):
+                _, type_des, details_type, index = calendar.get(day)
+                type_name, reason = self._day_type(details_type, type_des)
+                result.append({
+                    "date": date.fromordinal(first + day).isoformat(),
+                    "type": type_name,
+                    "reason": reason,
+                    "detailsType": details_type,
+                    "indexWorkDayOfMonth": index
+                })
+            ordinal = stop + 1
+        return result
 
-        for day in range(1, 32):
-            try:
-                current_date = datetime(year, month, day)
-                if current_date.month != month:
-                    break
-
-                is_weekend = current_date.weekday() >= 5
-                if is_weekend:
-                    continue
-
-                month_day = f"{month:02d}-{day:02d}"
-                year_str = str(year)
-
-                if year_str in self.holiday_data and month_day in self.holiday_data[year_str]:
-                    config = self.holiday_data[year_str][month_day]
-                    if config["type"] != 0:
-                        continue
-
-                workday_count += 1
-                if current_date == date_obj:
-                    return workday_count
-            except:
-                continue
+    def get_month_day_types(self, year: int, month: int) -> list:
+        """某月每一天的分类，见 get_day_types"""
+        return self.get_day_types(date(year, month, 1), date(year, month, monthrange(year, month)[1]))
 
-        return 0
+    def get_month_workday_indexes(self, year: int, month: int) -> list:
+        """一次取出某月每天的 indexWorkDayOfMonth（第几个工作日，非工作日为0）"""
+        return self._year_calendar(year).workday_indexes(month)
 
     def get_supported_years(self) -> list:
         """获取支持的年份"""
@@ -323,7 +621,7 @@ class HolidayChecker:
 
         if use_builtin:
             # 内置数据：返回holiday.json中的年份
-            years = list(self.holiday_data.keys())
+            years = [str(year) for year in self._builtin_calendars]
             if years:
                 return sorted(years)
             else:
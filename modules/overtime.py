@@ -1,6 +1,7 @@
 # modules/overtime.py
 from datetime import datetime
 from typing import Dict, Any
+from core.record import OvertimeRecord
 
 class OvertimeModule:
     """加班统计模块"""
@@ -15,9 +16,19 @@ class OvertimeModule:
         if month is None:
             month = datetime.now().strftime("%Y-%m")
 
-        records = self.data_manager.get_monthly_records(month)
-        if not records:
-            return {"month": month, "total_hours": 0, "details": {}, "empty": True}
+        # 有NumPy时用列式视图向量化汇总，否则逐条计算
+        table = self.data_manager.get_columnar()
+        if table is not None:
+            selection = table.select(month=month)
+            if not len(selection):
+                return {"month": month, "total_hours": 0, "details": {}, "empty": True}
+            summary = selection.summary_by_type()
+            return {
+                "month": month,
+                "total_hours": sum([v['hours'] for v in summary.values()]),
+                "details": summary,
+                "empty": False
+            }
 
         summary = {
             '工作日': {'hours': 0, 'count': 0},
@@ -27,25 +38,24 @@ class OvertimeModule:
             '请假': {'hours': 0, 'count': 0}
         }
 
-        for record in records:
+        # 逐条流式汇总，不先取出整月记录列表
+        empty = True
+        for record in self.data_manager.iter_records({'month': month}):
+            empty = False
             if len(record) < 4:
                 continue
 
-            day_type = record[2]
-            hours_str = record[3]
-            leave_type = record[4] if len(record) > 4 else "无"
-
-            try:
-                hours = float(hours_str) if hours_str != "无" else 0
-            except:
-                hours = 0
-
-            if leave_type != "无":
-                summary['请假']['hours'] += abs(hours)
+            # 记录在加载时已解析，直接使用解析后的字段
+            record = OvertimeRecord.from_row(record)
+            if record.is_leave:
+                summary['请假']['hours'] += abs(record.hours)
                 summary['请假']['count'] += 1
-            elif day_type in summary:
-                summary[day_type]['hours'] += hours
-                summary[day_type]['count'] += 1
+            elif record.day_type in summary:
+                summary[record.day_type]['hours'] += record.hours
+                summary[record.day_type]['count'] += 1
+
+        if empty:
+            return {"month": month, "total_hours": 0, "details": {}, "empty": True}
 
         total_hours = sum([v['hours'] for v in summary.values()])
 
@@ -1,5 +1,8 @@
 # modules/salary.py
 from typing import Dict, Any
+from datetime import date as date_cls
+from core.record import OvertimeRecord, DAY_TYPES
+from core.columnar import ColumnarSelection
 
 class SalaryModule:
     """加班工资计算模块"""
@@ -18,28 +21,35 @@ class SalaryModule:
             if hours <= 0:
                 return "0"
 
-            # 获取小时加班工资
-            hourly_wage = overtime_pay.get('hourly_wage', 50.0)
-
-            # 获取倍率
-            rate = 0
-            if day_type == "工作日":
-                rate = overtime_pay.get('weekday_rate', 1.5)
-            elif day_type == "休息日":
-                rate = overtime_pay.get('weekend_rate', 2.0)
-            elif day_type == "节假日":
-                rate = overtime_pay.get('holiday_rate', 3.0)
-            elif day_type == "调休日":
-                rate = 1.5
-
-            # 计算：小时加班工资 × 时长 × 倍率
-            salary = hourly_wage * hours * rate
+            salary = self.calculate_amount(overtime_pay, hours, day_type)
             return f"{salary:.2f}元"
         except:
             return "0"
 
-    def calculate_batch(self, records: list) -> tuple:
-        """批量计算加班工资"""
+    @staticmethod
+    def get_rate(overtime_pay: Dict[str, Any], day_type: str) -> float:
+        """获取日期类型对应的加班倍率"""
+        if day_type == "工作日":
+            return overtime_pay.get('weekday_rate', 1.5)
+        elif day_type == "休息日":
+            return overtime_pay.get('weekend_rate', 2.0)
+        elif day_type == "节假日":
+            return overtime_pay.get('holiday_rate', 3.0)
+        elif day_type == "调休日":
+            return 1.5
+        return 0
+
+    def calculate_amount(self, overtime_pay: Dict[str, Any], hours: float, day_type: str) -> float:
+        """计算：小时加班工资 × 时长 × 倍率（返回数值，单位元）"""
+        hourly_wage = overtime_pay.get('hourly_wage', 50.0)
+        return hourly_wage * hours * self.get_rate(overtime_pay, day_type)
+
+    def calculate_batch(self, records, with_details: bool = True) -> tuple:
+        """批量计算加班工资
+
+        records 为任意可迭代的记录（列表或 DataManager.iter_records() 生成器），或列式视图的选择结果（ColumnarSelection，向量化计算）；
+        只需要总额时传 with_details=False 可省去逐条明细。
+        """
         total_salary = 0
         details = []
 
@@ -47,50 +57,57 @@ class SalaryModule:
         if not overtime_pay.get('enabled', False):
             return 0, []
 
-        hourly_wage = overtime_pay.get('hourly_wage', 50.0)
         deduct_types = overtime_pay.get('deduct_types', ['事假'])
 
+        if isinstance(records, ColumnarSelection):
+            return self._calculate_columnar(records, overtime_pay, deduct_types, with_details)
+
         for record in records:
             if len(record) < 4:
                 continue
 
-            date = record[0]
-            day_type = record[2]
-            hours_str = record[3]
-            leave_type = record[4] if len(record) > 4 else "无"
+            # 记录在加载时已解析，直接使用数值字段
+            record = OvertimeRecord.from_row(record)
 
             # 检查是否需要计算加班工资
-            if leave_type != "无":
-                if leave_type not in deduct_types:
+            if record.is_leave:
+                if record.leave_type not in deduct_types:
                     continue
 
-            # 获取倍率
-            rate = 0
-            if day_type == "工作日":
-                rate = overtime_pay.get('weekday_rate', 1.5)
-            elif day_type == "休息日":
-                rate = overtime_pay.get('weekend_rate', 2.0)
-            elif day_type == "节假日":
-                rate = overtime_pay.get('holiday_rate', 3.0)
-            elif day_type == "调休日":
-                rate = 1.5
-
-            try:
-                hours = float(hours_str)
-                if hours > 0:
-                    salary = hourly_wage * hours * rate
-                    total_salary += salary
-                    details.append({
-                        'date': date,
-                        'day_type': day_type,
-                        'hours': hours_str,
-                        'salary': f"{salary:.2f}元"
-                    })
-            except:
-                pass
+            if record.hours > 0:
+                salary = self.calculate_amount(overtime_pay, record.hours, record.day_type)
+                total_salary += salary
+                details.append({
+                    'date': record.date,
+                    'day_type': record.day_type,
+                    'hours': record[3],
+                    'salary': f"{salary:.2f}元"
+                })
 
         return total_salary, details
 
+    def _calculate_columnar(self, selection, overtime_pay, deduct_types, with_details) -> tuple:
+        """向量化计算：按类型编码查倍率表，一次算出所有行的工资"""
+        rates = {day_type: self.get_rate(overtime_pay, day_type)
+                 for day_type in ("工作日", "休息日", "节假日", "调休日")}
+        counted = selection.counted(deduct_types)
+        amounts = selection.salary_amounts(rates, overtime_pay.get('hourly_wage', 50.0), counted)
+        # 按行顺序逐个累加（与逐条计算一致），不用 sum() 的两两求和
+        total_salary = sum(amounts.tolist())
+        if not with_details:
+            return total_salary, []
+
+        details = []
+        # 明细与逐条计算一致：计入的行都列出，倍率为0（未知类型）的记为0.00元
+        for index in counted.nonzero()[0]:
+            details.append({
+                'date': date_cls.fromordinal(int(selection.ordinal[index])).isoformat(),
+                'day_type': DAY_TYPES.names[selection.type[index]],
+                'hours': selection.hours_label(index),
+                'salary': f"{amounts[index]:.2f}元"
+            })
+        return total_salary, details
+
     def get_summary_text(self, summary: Dict[str, Any]) -> str:
         """获取加班工资汇总文本"""
         if not self.config_manager.get('overtime_pay.enabled', False):
@@ -103,14 +120,14 @@ class SalaryModule:
         text = f"【{month} 月加班工资汇总】\n"
         text += f"小时加班工资: {hourly_wage}元/小时\n\n"
 
+        overtime_pay = self.config_manager.get('overtime_pay', {})
         total_salary = 0
         for day_type, data in details.items():
             if data['hours'] > 0:
-                salary = self.calculate("2024-01-01", str(data['hours']), day_type)
-                if salary != "0":
-                    salary_val = float(salary.replace('元', ''))
+                salary_val = self.calculate_amount(overtime_pay, data['hours'], day_type)
+                if salary_val > 0:
                     total_salary += salary_val
-                    text += f"  {day_type}: {data['hours']:.1f}小时 → {salary}\n"
+                    text += f"  {day_type}: {data['hours']:.1f}小时 → {salary_val:.2f}元\n"
 
         if total_salary > 0:
             text += f"\n总计: {total_salary:.2f}元"
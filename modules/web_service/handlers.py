@@ -7,6 +7,11 @@ from urllib.parse import parse_qs, urlparse
 class OvertimeWebHandler(http.server.SimpleHTTPRequestHandler):
     """Web服务请求处理器"""
 
+    # /api/records 单页最多返回的记录数
+    MAX_PAGE_SIZE = 500
+    # /api/calendar 允许浏览器缓存的秒数（切换节假日数据源后最多这么久生效）
+    CALENDAR_CACHE_SECONDS = 3600
+
     def __init__(self, *args, callbacks=None, **kwargs):
         self.callbacks = callbacks or {}
         super().__init__(*args, **kwargs)
@@ -29,6 +34,33 @@ class OvertimeWebHandler(http.server.SimpleHTTPRequestHandler):
             data = self.callbacks.get('get_data', lambda: [])()
             self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
 
+        elif parsed_path.path == '/api/records':
+            # 游标分页：/api/records?cursor=&limit=&user=&date_start=&date_end=&type=&order=desc
+            params = parse_qs(parsed_path.query)
+            cursor = params.get('cursor', [''])[0] or None
+            try:
+                limit = int(params.get('limit', ['20'])[0] or 20)
+            except ValueError:
+                self.send_json_response({'error': 'limit 必须是整数'}, 400)
+                return
+            limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+            filters = {key: params[key][0] for key in ('user', 'date_start', 'date_end', 'type')
+                       if params.get(key, [''])[0]}
+            newest_first = params.get('order', ['asc'])[0] == 'desc'
+
+            if not self.callbacks.get('get_records_page'):
+                self.send_json_response({'error': '回调未注册'}, 500)
+                return
+            try:
+                result = self.callbacks['get_records_page'](filters, cursor, limit, newest_first)
+            except ValueError as e:
+                self.send_json_response({'error': str(e)}, 400)
+                return
+            except Exception as e:
+                self.send_json_response({'error': str(e)}, 500)
+                return
+            self.send_json_response(result)
+
         elif parsed_path.path == '/api/check_date':
             # 正确解析日期参数
             query = parsed_path.query
@@ -64,6 +96,30 @@ class OvertimeWebHandler(http.server.SimpleHTTPRequestHandler):
             else:
                 self.send_json_response({'error': '回调未注册'}, 500)
 
+        elif parsed_path.path == '/api/calendar':
+            # 整月日期分类：/api/calendar?year=2026&month=5，浏览器缓存后本地判断
+            params = parse_qs(parsed_path.query)
+            try:
+                year = int(params.get('year', [''])[0])
+                month = int(params.get('month', [''])[0])
+            except ValueError:
+                self.send_json_response({'error': 'year 和 month 必须是整数'}, 400)
+                return
+            if not (1 <= year <= 9999 and 1 <= month <= 12):
+                self.send_json_response({'error': '年份或月份超出范围'}, 400)
+                return
+
+            if not self.callbacks.get('get_calendar'):
+                self.send_json_response({'error': '回调未注册'}, 500)
+                return
+            try:
+                days = self.callbacks['get_calendar'](year, month)
+            except Exception as e:
+                self.send_json_response({'error': str(e)}, 500)
+                return
+            self.send_json_response({'year': year, 'month': month, 'days': days},
+                                    cache_seconds=self.CALENDAR_CACHE_SECONDS)
+
         elif parsed_path.path == '/status':
             self.send_response(200)
             self.send_header('Content-type', 'text/plain')
@@ -152,10 +208,12 @@ class OvertimeWebHandler(http.server.SimpleHTTPRequestHandler):
         else:
             self.send_error(404, "Not found")
 
-    def send_json_response(self, data, code=200):
+    def send_json_response(self, data, code=200, cache_seconds=0):
         self.send_response(code)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if cache_seconds:
+            self.send_header('Cache-Control', f'max-age={cache_seconds}')
         self.end_headers()
         self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
 
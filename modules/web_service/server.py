@@ -29,7 +29,9 @@ class WebServiceModule:
             port = self.config_manager.get('web_port', 8080)
 
             handler = lambda *args: OvertimeWebHandler(*args, callbacks=self.callbacks)
-            self.server = socketserver.TCPServer(("", port), handler)
+            # 每个请求一个线程，并发提交由 DataManager 的组提交合并写入
+            self.server = socketserver.ThreadingTCPServer(("", port), handler)
+            self.server.daemon_threads = True
             self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.thread.start()
 
@@ -61,6 +63,10 @@ class WebServiceModule:
         except Exception as e:
             return False, str(e)
 
+    def is_running(self) -> bool:
+        """服务是否在运行"""
+        return self.running
+
     def get_status(self) -> dict:
         """获取服务状态"""
         if self.running:
@@ -111,6 +111,7 @@ def get_html_template(leave_types, webhook_enabled, holiday_info):
 
         <div style="margin-top: 20px; text-align: center;">
             <a href="/api/data" target="_blank">查看JSON数据</a> |
+            <a href="/api/records?limit=50&order=desc" target="_blank">分页记录</a> |
             <a href="/status" target="_blank">服务状态</a>
         </div>
     </div>
@@ -141,6 +142,38 @@ def get_html_template(leave_types, webhook_enabled, holiday_info):
             }}
         }}
 
+        // 按月缓存的日期分类：同一个月只请求一次 /api/calendar，之后在本地判断
+        const calendarCache = {{}};
+
+        function loadMonth(year, month) {{
+            const key = `${{year}}-${{month}}`;
+            if (!calendarCache[key]) {{
+                calendarCache[key] = fetch(`/api/calendar?year=${{year}}&month=${{month}}`)
+                    .then(response => response.json())
+                    .then(data => {{
+                        if (data.error) throw new Error(data.error);
+                        const days = {{}};
+                        data.days.forEach(day => {{ days[day.date] = day; }});
+                        return days;
+                    }})
+                    .catch(error => {{
+                        delete calendarCache[key];
+                        throw error;
+                    }});
+            }}
+            return calendarCache[key];
+        }}
+
+        function classifyDate(date) {{
+            const match = /^([0-9]{{4}})-([0-9]{{2}})-([0-9]{{2}})$/.exec(date);
+            if (!match) {{
+                return fetch(`/api/check_date?date=${{date}}`).then(response => response.json());
+            }}
+            return loadMonth(Number(match[1]), Number(match[2]))
+                .then(days => days[date] || {{error: '日期无效'}})
+                .catch(() => fetch(`/api/check_date?date=${{date}}`).then(response => response.json()));
+        }}
+
         function autoDetectDayType() {{
             const date = document.getElementById('date_input').value;
             if (!date) return;
@@ -148,8 +181,7 @@ def get_html_template(leave_types, webhook_enabled, holiday_info):
             const resultDiv = document.getElementById('date_result');
             resultDiv.innerHTML = "正在自动判断...";
 
-            fetch(`/api/check_date?date=${{date}}`)
-                .then(response => response.json())
+            classifyDate(date)
                 .then(data => {{
                     if (data.error) {{
                         resultDiv.innerHTML = "❌ " + data.error;
@@ -2,22 +2,82 @@
 # -*- coding: utf-8 -*-
 """
 数据备份脚本
-功能：手动备份数据文件
+功能：手动备份数据文件（任意存储引擎均导出为CSV快照）
 """
 
 import os
+import csv
 import shutil
 import datetime
 import sys
+import tempfile
+
+# 以 python scripts/backup_data.py 运行时，让 core 包可被导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import ConfigManager
+from core.data_manager import DataManager
+from core.storage import CSV_HEADER, RECORD_WIDTH, header_has_ids
+from core.journal import WriteAheadJournal
+
+DATA_DIR = "data"
+
+
+def write_snapshot(data_manager, snapshot_file):
+    """逐条读取当前有效记录写成CSV快照（含记录ID），返回记录数
+
+    已删除/修改的记录按操作日志生效后的结果写出，各种存储引擎的备份格式一致。
+    """
+    temp_file = snapshot_file + ".tmp"
+    count = 0
+    with open(temp_file, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for record_id, record in data_manager.iter_records(with_ids=True):
+            writer.writerow(list(record) + [record_id])
+            count += 1
+    os.replace(temp_file, snapshot_file)
+    return count
+
+
+def copy_raw_files(data_manager, staging_dir):
+    """复制CSV数据文件、操作日志和编码记录的原件（调用方持有写锁，只做文件复制）"""
+    for path in (data_manager.overtime_file, data_manager.ops_file, data_manager.encoding_file):
+        if os.path.exists(path):
+            shutil.copy2(path, os.path.join(staging_dir, os.path.basename(path)))
+
+
+def write_staged_snapshot(staging_dir, snapshot_file):
+    """从 copy_raw_files 复制的原件生成快照（不持锁），完成后删除副本目录，返回记录数"""
+    staged = DataManager(data_dir=staging_dir)
+    try:
+        return write_snapshot(staged, snapshot_file)
+    finally:
+        staged.close()
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def snapshot_max_id(snapshot_file):
+    """快照中的最大记录ID（表头无记录ID列时为0）"""
+    max_id = 0
+    with open(snapshot_file, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        reader = csv.reader(f)
+        if not header_has_ids(next(reader, None) or []):
+            return 0
+        for row in reader:
+            if len(row) > RECORD_WIDTH and row[RECORD_WIDTH].isascii() and row[RECORD_WIDTH].isdigit():
+                max_id = max(max_id, int(row[RECORD_WIDTH]))
+    return max_id
+
 
 def backup_data():
     """执行备份"""
-    data_dir = "data"
-    backup_dir = os.path.join(data_dir, "backup")
-    csv_file = os.path.join(data_dir, "overtime_records.csv")
+    backup_dir = os.path.join(DATA_DIR, "backup")
+    engine = ConfigManager().get('storage_engine', 'csv')
 
     # 检查源文件
-    if not os.path.exists(csv_file):
+    csv_file = os.path.join(DATA_DIR, "overtime_records.csv")
+    if engine == "csv" and not os.path.exists(csv_file):
         print(f"❌ 未找到数据文件: {csv_file}")
         return False
 
@@ -30,20 +90,34 @@ def backup_data():
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_file = os.path.join(backup_dir, f"overtime_records_{timestamp}.csv")
 
-    # 执行备份
+    data_manager = DataManager(data_dir=DATA_DIR, storage_engine=engine)
     try:
-        shutil.copy2(csv_file, backup_file)
+        # CSV引擎：持写锁只复制原件（不含写了一半的行），释放锁后再逐条解析写出快照，
+        # 运行中的程序写入不会因备份大文件等待锁超时
+        if engine == "csv":
+            staging_dir = tempfile.mkdtemp(prefix="snapshot_", dir=backup_dir)
+            try:
+                with data_manager.file_lock:
+                    copy_raw_files(data_manager, staging_dir)
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            count = write_staged_snapshot(staging_dir, backup_file)
+        else:
+            count = write_snapshot(data_manager, backup_file)
         file_size = os.path.getsize(backup_file)
         print(f"✅ 备份成功: {backup_file}")
-        print(f"   文件大小: {file_size/1024:.2f} KB")
+        print(f"   记录数: {count} 条，文件大小: {file_size/1024:.2f} KB")
         return True
     except Exception as e:
         print(f"❌ 备份失败: {e}")
         return False
+    finally:
+        data_manager.close()
 
 def list_backups():
     """列出所有备份"""
-    backup_dir = os.path.join("data", "backup")
+    backup_dir = os.path.join(DATA_DIR, "backup")
     if not os.path.exists(backup_dir):
         print("暂无备份文件")
         return
@@ -65,29 +139,55 @@ def list_backups():
         print(f"  {name} | {mtime.strftime('%Y-%m-%d %H:%M')} | {size/1024:.1f} KB")
 
 def restore_backup(backup_name):
-    """恢复备份"""
-    backup_dir = os.path.join("data", "backup")
+    """恢复备份（CSV存储引擎）"""
+    backup_dir = os.path.join(DATA_DIR, "backup")
     backup_file = os.path.join(backup_dir, backup_name)
-    csv_file = os.path.join("data", "overtime_records.csv")
+    csv_file = os.path.join(DATA_DIR, "overtime_records.csv")
 
     if not os.path.exists(backup_file):
         print(f"❌ 备份文件不存在: {backup_name}")
         return False
 
+    engine = ConfigManager().get('storage_engine', 'csv')
+    if engine != "csv":
+        print(f"❌ 当前存储引擎为 {engine}，此脚本只恢复CSV数据文件")
+        return False
+
+    data_manager = DataManager(data_dir=DATA_DIR)
+    staging_dir = tempfile.mkdtemp(prefix="snapshot_", dir=backup_dir)
     try:
-        # 先备份当前数据
-        if os.path.exists(csv_file):
+        # 解析备份文件在取锁之前完成
+        max_id = snapshot_max_id(backup_file)
+        # 持有写锁，程序正在运行时恢复也不会与追加写入交错；锁内只做文件复制和替换
+        with data_manager.file_lock:
+            # 先复制当前数据的原件，恢复后再生成快照
+            copy_raw_files(data_manager, staging_dir)
+
+            # 恢复：先复制到临时文件再原子替换，读取方不会看到半个文件
+            temp_file = csv_file + ".restore"
+            shutil.copy2(backup_file, temp_file)
+            # 预写日志中的偏移针对原数据文件，替换前清空
+            WriteAheadJournal(data_manager.journal_file).checkpoint(durable=True)
+            os.replace(temp_file, csv_file)
+            # 操作日志针对的是原数据文件，恢复后不再适用；只记下快照的最大ID，
+            # 快照中删除留下的ID空缺较大时，读取时仍按记录ID列识别记录
+            with open(data_manager.ops_file, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(["N", str(max_id)])
+
+        # 恢复前数据的快照（操作日志生效后的结果）
+        if os.path.exists(os.path.join(staging_dir, os.path.basename(csv_file))):
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             current_backup = os.path.join(backup_dir, f"overtime_records_current_{timestamp}.csv")
-            shutil.copy2(csv_file, current_backup)
+            write_staged_snapshot(staging_dir, current_backup)
             print(f"✓已备份当前数据: {current_backup}")
-
-        # 恢复        shutil.copy2(backup_file, csv_file)
         print(f"✅ 恢复成功: {backup_name}")
         return True
     except Exception as e:
         print(f"❌ 恢复失败: {e}")
         return False
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        data_manager.close()
 
 def main():
     print("="*60)
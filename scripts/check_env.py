@@ -93,7 +93,9 @@ def main():
     print(f"\n可选依赖（增强功能）：")
     optional_deps = [
         ("chinese-calendar", "chinese-calendar", "节假日判断"),
-        ("openpyxl", "openpyxl", "Excel导出")
+        ("openpyxl", "openpyxl", "Excel导出"),
+        ("numpy", "numpy", "大数据量统计加速"),
+        ("pyarrow", "pyarrow", "Parquet导出")
     ]
 
     for pkg, import_name, level in optional_deps:
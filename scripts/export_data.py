@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据导出脚本
+功能：把全部记录导出为 Excel / gzip压缩CSV / JSON Lines / Parquet，供下游程序读取
+"""
+
+import os
+import sys
+
+# 以 python scripts/export_data.py 运行时，让 core 包可被导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import ConfigManager
+from core.data_manager import DataManager
+from core.exporters import EXPORT_FORMATS, detect_format
+
+
+def export(file_path, fmt=None, data_dir="data"):
+    """按配置的存储引擎读取记录并导出"""
+    fmt = fmt or detect_format(file_path)
+    if fmt is None:
+        print(f"❌ 无法根据扩展名判断导出格式: {file_path}")
+        return False
+
+    config = ConfigManager()
+    data_manager = DataManager(data_dir=data_dir,
+                               storage_engine=config.get('storage_engine', 'csv'),
+                               read_mode=config.get('read_mode', 'cache'))
+    try:
+        def progress(done, total):
+            if total is None:
+                print(f"\r   已导出 {done} 条", end="", flush=True)
+            else:
+                print(f"\r   已导出 {done}/{total} 条", end="", flush=True)
+
+        result = data_manager.export(file_path, fmt, progress)
+        print()
+    finally:
+        data_manager.close()
+
+    if result:
+        print(f"✅ 导出成功: {file_path}（{os.path.getsize(file_path)/1024:.1f} KB）")
+    return result
+
+
+def main():
+    print("="*60)
+    print("📤 数据导出工具")
+    print("="*60)
+
+    args = sys.argv[1:]
+    fmt = None
+    if len(args) == 3 and args[0] == "--format":
+        fmt, args = args[1], args[2:]
+
+    if len(args) == 1:
+        export(args[0], fmt)
+    else:
+        suffixes = " / ".join(suffix for suffix, _ in EXPORT_FORMATS)
+        print("用法:")
+        print("  python scripts/export_data.py <输出文件>                 - 按扩展名选择格式")
+        print("  python scripts/export_data.py --format <格式> <输出文件>  - 指定格式")
+        print(f"  支持的扩展名: {suffixes}")
+        print("  格式: excel / csv_gz / ndjson / parquet（Parquet 需安装 pyarrow）")
+
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -45,7 +45,9 @@ def main():
         ("tkcalendar", "日历选择器（必需）"),
         ("requests", "HTTP请求库（必需，支持Webhook）"),
         ("chinese-calendar", "中国节假日1判断（推荐）"),
-        ("openpyxl", "Excel导出（可选）")
+        ("openpyxl", "Excel导出（可选）"),
+        ("numpy", "大数据量统计加速（可选）"),
+        ("pyarrow", "Parquet导出（可选）")
     ]
 
     print("\n当前环境检测：")
@@ -109,6 +111,8 @@ def main():
     print("  - requests: 必需，支持Web服务和Webhook")
     print("  - chinese-calendar:推荐，增强节假日判断")
     print("  - openpyxl: 可选，支持Excel导出")
+    print("  - numpy: 可选，大数据量时向量化统计")
+    print("  - pyarrow: 可选，导出Parquet格式")
     print("="*60)
 
 if __name__ == "__main__":
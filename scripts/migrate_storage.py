@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存储迁移脚本
+功能：把单文件 data/overtime_records.csv 迁移到 SQLite 或按月分区存储
+"""
+
+import os
+import sys
+
+# 以 python scripts/migrate_storage.py 运行时，让 core 包可被导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_manager import DataManager
+
+ENGINES = ("sqlite", "partitioned")
+
+
+def migrate(engine, data_dir="data"):
+    """执行迁移（DataManager 初始化时会一次性迁移原CSV数据）"""
+    csv_file = os.path.join(data_dir, "overtime_records.csv")
+    if not os.path.exists(csv_file):
+        print(f"❌ 未找到数据文件: {csv_file}")
+        return False
+
+    source = DataManager(data_dir=data_dir)
+    expected = len(source.get_all_records())
+    source.close()
+
+    target = DataManager(data_dir=data_dir, storage_engine=engine)
+    migrated = len(target.get_all_records())
+    target.close()
+
+    if migrated < expected:
+        print(f"❌ 迁移后记录数不一致: CSV {expected} 条，{engine} {migrated} 条")
+        return False
+
+    print(f"✅ 迁移完成: {migrated} 条记录")
+    print(f"   请在 config.json 中设置 \"storage_engine\": \"{engine}\" 后重启程序")
+    print(f"   原CSV文件已保留，确认无误后可自行归档")
+    return True
+
+
+def main():
+    print("="*60)
+    print("🔄 存储迁移工具")
+    print("="*60)
+
+    if len(sys.argv) > 1 and sys.argv[1] in ENGINES:
+        migrate(sys.argv[1])
+    else:
+        print("用法:")
+        print("  python scripts/migrate_storage.py sqlite      - 迁移到SQLite")
+        print("  python scripts/migrate_storage.py partitioned - 拆分为按月分区文件")
+
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -37,7 +37,14 @@ class OvertimeSystem:
 
         # 1. 核心组件
         self.config_manager = ConfigManager()
-        self.data_manager = DataManager()
+        self.data_manager = DataManager(
+            storage_engine=self.config_manager.get('storage_engine', 'csv'),
+            group_commit_ms=self.config_manager.get('group_commit_ms', 5),
+            read_mode=self.config_manager.get('read_mode', 'cache'),
+            journal=self.config_manager.get('journal', False),
+            fsync_policy=self.config_manager.get('fsync_policy', 'batch'),
+            fsync_interval_ms=self.config_manager.get('fsync_interval_ms', 1000)
+        )
 
         # 创建数据文件
         try:
@@ -107,23 +114,36 @@ class OvertimeSystem:
 
             return get_html_template(leave_types, webhook_enabled, holiday_status)
 
-        # 获取数据
+        def record_to_dict(record):
+            return {
+                '日期': record[0], '用户': record[1], '类型': record[2],
+                '加班时长': record[3], '请假类型': record[4], '请假时长': record[5],
+                '提交时间': record[6], '加班工资': record[7]
+            }
+
+        # 获取数据（最近10条，只读取这一页）
         def get_data():
-            records = self.data_manager.get_all_records()
-            result = []
-            for record in records[-10:]:
-                if len(record) >= 8:
-                    result.append({
-                        '日期': record[0], '用户': record[1], '类型': record[2],
-                        '加班时长': record[3], '请假类型': record[4], '请假时长': record[5],
-                        '提交时间': record[6], '加班工资': record[7]
-                    })
-            return result
+            items, _ = self.data_manager.page(page_size=10, newest_first=True)
+            return [record_to_dict(record) for _, record in reversed(items) if len(record) >= 8]
+
+        # 分页获取记录：返回一页记录和下一页游标
+        def get_records_page(filters, cursor, limit, newest_first):
+            items, next_cursor = self.data_manager.page(filters, cursor, limit, newest_first)
+            records = []
+            for record_id, record in items:
+                item = record_to_dict(record)
+                item['记录ID'] = record_id
+                records.append(item)
+            return {'records': records, 'next_cursor': next_cursor}
 
         # 检查日期
         def check_date(date):
             return self.modules['holiday'].get_day_type(date)
 
+        # 整月日期分类
+        def get_calendar(year, month):
+            return self.modules['holiday'].get_month_day_types(year, month)
+
         # 提交记录
         def submit_record(data):
             try:
@@ -172,7 +192,9 @@ class OvertimeSystem:
 
         web_service.register_callback('get_html', get_html)
         web_service.register_callback('get_data', get_data)
+        web_service.register_callback('get_records_page', get_records_page)
         web_service.register_callback('check_date', check_date)
+        web_service.register_callback('get_calendar', get_calendar)
         web_service.register_callback('submit_record', submit_record)
 
     def open_settings(self):
@@ -283,8 +305,10 @@ class OvertimeSystem:
             if self.modules['web_service'].is_running():
                 if messagebox.askyesno("确认", "Web服务正在运行，确定要退出吗？"):
                     self.stop_web_service()
+                    self.data_manager.close()
                     self.root.destroy()
             else:
+                self.data_manager.close()
                 self.root.destroy()
         except:
             self.root.destroy()
@@ -0,0 +1,94 @@
+# tests/test_holiday.py
+"""节假日数据源：holiday.json 覆盖的年份内，chinese_calendar 编译出的分类与内置数据一致"""
+import os
+import sys
+import unittest
+import importlib.util
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.holiday import HolidayChecker, _LUNAR_FESTIVALS
+
+
+@unittest.skipUnless(importlib.util.find_spec("chinese_calendar"), "未安装 chinese_calendar")
+class CalendarSourcesAgreeTest(unittest.TestCase):
+
+    def setUp(self):
+        # holiday.json 按相对路径读取
+        self._cwd = os.getcwd()
+        os.chdir(ROOT)
+        self.checker = HolidayChecker({"use_builtin_holiday": True})
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+
+    def test_sources_agree_for_builtin_years(self):
+        builtin = self.checker._builtin_calendars
+        self.assertTrue(builtin)
+        for year, calendar in builtin.items():
+            library = self.checker._chinese_calendar.year_calendar(year)
+            if library is None:
+                continue
+            with self.subTest(year=year):
+                for day in range(len(calendar)):
+                    self.assertEqual(library.get(day), calendar.get(day),
+                                     date.fromordinal(calendar.first_ordinal + day))
+
+    def test_lunar_festivals_cover_library_years(self):
+        import chinese_calendar
+        first, last = min(chinese_calendar.holidays).year, max(chinese_calendar.holidays).year
+        missing = [year for year in range(first, last + 1) if year not in _LUNAR_FESTIVALS]
+        self.assertEqual(missing, [])
+
+    def test_only_statutory_days_pay_triple(self):
+        self.assertEqual(self.checker.get_holiday_info("2025-01-01")["detailsType"], 3)
+        library = self.checker._chinese_calendar.year_calendar(2025)
+        triple = [date.fromordinal(library.first_ordinal + day).isoformat()
+                  for day in range(len(library)) if library.details[day] == 3]
+        self.assertEqual(triple, [
+            "2025-01-01", "2025-01-28", "2025-01-29", "2025-01-30", "2025-01-31",
+            "2025-04-04", "2025-05-01", "2025-05-02", "2025-05-31",
+            "2025-10-01", "2025-10-02", "2025-10-03", "2025-10-06",
+        ])
+
+
+class _CountingConfig(dict):
+    """记录读取次数的配置"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def get(self, key, default=None):
+        self.reads += 1
+        return super().get(key, default)
+
+
+class SourceSelectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        os.chdir(ROOT)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+
+    def test_lookups_do_not_read_config_until_reload(self):
+        config = _CountingConfig(use_builtin_holiday=True)
+        checker = HolidayChecker(config)
+        reads = config.reads
+        self.assertEqual(checker.get_day_type("2026-01-01"), ("节假日", "元旦(三倍)"))
+        checker.get_day_types("2025-01-01", "2026-12-31")
+        self.assertEqual(config.reads, reads)
+
+        # 修改配置后 reload 才切换数据源
+        config["use_builtin_holiday"] = False
+        self.assertEqual(checker._active[0], "builtin")
+        checker.reload()
+        self.assertNotEqual(checker._active[0], "builtin")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# tests/test_iter_records.py
+"""流式读取：迭代期间数据文件被压缩，剩余记录仍全部产出"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_manager import DataManager
+
+
+def _record(i: int):
+    return [f"2024-05-{i % 28 + 1:02d}", "张三", "工作日", "2", "无", "无", "2024-05-01 18:00:00", "100.00元"]
+
+
+class CompactDuringIterationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.dm = DataManager(self.data_dir)
+
+    def tearDown(self):
+        self.dm.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_compact_mid_iteration_yields_every_record(self):
+        self.assertTrue(self.dm.add_records([_record(i) for i in range(5000)]))
+        self.assertTrue(self.dm.delete_record(1))
+        # 加载缓存，迭代走缓存分批读取
+        expected = [record_id for record_id, _ in self.dm.get_all_records_with_ids()]
+        self.assertEqual(len(expected), 4999)
+
+        items = self.dm.iter_records(with_ids=True)
+        seen = [record_id for record_id, _ in islice(items, 1500)]
+        self.assertTrue(self.dm.compact())
+        seen.extend(record_id for record_id, _ in items)
+        self.assertEqual(seen, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# tests/test_journal.py
+"""预写日志：各落盘策略下追加写到一半时崩溃，重启后按日志修复"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.data_manager as data_manager_module
+from core.data_manager import DataManager
+from core.journal import FSYNC_POLICIES, WriteAheadJournal
+
+
+class _Crash(BaseException):
+    """模拟进程在写数据文件途中被杀死（不走写入失败的回滚）"""
+
+
+def _record(day: int):
+    return [f"2024-05-{day:02d}", "张三", "工作日", "2", "无", "无", "2024-05-01 18:00:00", "100.00元"]
+
+
+class TornTailReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def _open(self, policy):
+        return DataManager(self.data_dir, journal=True, fsync_policy=policy,
+                           fsync_interval_ms=60000, group_commit_ms=0)
+
+    def _crash_during_append(self, dm, records):
+        """写入线程停止后 add_records 在调用线程中执行；数据文件只写入一半就崩溃"""
+        dm._writer.stop()
+        if dm._flusher is not None:
+            dm._flush_stop.set()
+            dm._flusher.join()
+
+        journal_syncs = []
+        real_append = WriteAheadJournal.append
+
+        def append(journal, offset, payload, sync=False):
+            journal_syncs.append(sync)
+            return real_append(journal, offset, payload, sync)
+
+        class TornFile:
+            def __init__(self, f):
+                self._f = f
+
+            def write(self, data):
+                self._f.write(data[:len(data) // 2])
+                self._f.flush()
+                raise _Crash()
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._f.close()
+
+        def torn_open(path, mode='r', *args, **kwargs):
+            f = open(path, mode, *args, **kwargs)
+            if path == dm.overtime_file and mode == 'ab':
+                return TornFile(f)
+            return f
+
+        with mock.patch.object(WriteAheadJournal, "append", append), \
+                mock.patch.object(data_manager_module, "open", torn_open, create=True):
+            with self.assertRaises(_Crash):
+                dm.add_records(records)
+        return journal_syncs
+
+    def test_torn_tail_is_replayed_under_every_policy(self):
+        for policy in FSYNC_POLICIES:
+            with self.subTest(policy=policy):
+                shutil.rmtree(self.data_dir, ignore_errors=True)
+                dm = self._open(policy)
+                self.assertTrue(dm.add_records([_record(1), _record(2)]))
+                journal_syncs = self._crash_during_append(dm, [_record(3), _record(4)])
+                # 日志条目必须在写数据文件之前落盘
+                self.assertEqual(journal_syncs, [True])
+
+                restarted = self._open(policy)
+                try:
+                    records = restarted.get_all_records_with_ids()
+                    self.assertEqual([record_id for record_id, _ in records], [1, 2, 3, 4])
+                    self.assertEqual([list(record) for _, record in records],
+                                     [_record(day) for day in (1, 2, 3, 4)])
+                    self.assertEqual(os.path.getsize(restarted.journal_file), 0)
+                finally:
+                    restarted.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_salary.py
+"""加班工资：列式视图向量化计算与逐条计算的总额和明细完全一致"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.columnar import numpy_available
+from core.data_manager import DataManager
+from modules.salary import SalaryModule
+
+
+class _Config:
+    def __init__(self, values):
+        self._values = values
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+
+def _record(day: int, day_type: str, hours: str, leave_type: str = "无", leave_hours: str = "无"):
+    return [f"2024-05-{day:02d}", "张三", day_type, hours, leave_type, leave_hours, "2024-05-01 18:00:00", "0.00元"]
+
+
+@unittest.skipUnless(numpy_available(), "未安装 NumPy")
+class ColumnarSalaryParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.dm = DataManager(self.data_dir)
+        self.salary = SalaryModule(_Config({"overtime_pay": {
+            "enabled": True, "hourly_wage": 37.3, "deduct_types": ["事假"]}}))
+
+    def tearDown(self):
+        self.dm.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_columnar_matches_per_record(self):
+        self.assertTrue(self.dm.add_records([
+            _record(1, "工作日", "2.3"),
+            _record(2, "休息日", "2.0"),       # 原文与 "%g" 格式不同
+            _record(3, "加班", "3"),           # 旧数据中的未知类型：倍率为0，明细记0.00元
+            _record(4, "节假日", "0"),
+            _record(5, "工作日", "1.7", "事假", "1.7"),
+            _record(6, "工作日", "1.5", "病假", "1.5"),
+            _record(7, "调休日", "0.35"),
+            _record(8, "工作日", "无"),
+        ]))
+        selection = self.dm.get_columnar().select(month="2024-05")
+        records = list(self.dm.iter_records({"month": "2024-05"}))
+
+        columnar = self.salary.calculate_batch(selection)
+        per_record = self.salary.calculate_batch(records)
+        self.assertEqual(columnar, per_record)
+        self.assertIn({"date": "2024-05-03", "day_type": "加班", "hours": "3", "salary": "0.00元"},
+                      per_record[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# tests/test_storage_order.py
+"""各存储引擎返回的记录顺序一致（按记录ID）"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_manager import DataManager
+
+ENGINES = ("csv", "sqlite", "partitioned")
+
+
+def _record(month: int, day: int, user: str):
+    return [f"2024-{month:02d}-{day:02d}", user, "工作日", "2", "无", "无", "2024-05-01 18:00:00", "100.00元"]
+
+
+class EngineOrderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        # 补录的早月份记录ID较大：分区顺序与ID顺序不同
+        records = [_record(month, day, user) for day in (3, 1, 2) for month in (5, 3, 4)
+                   for user in ("张三", "李四")]
+        self.managers = {}
+        for engine in ENGINES:
+            dm = DataManager(os.path.join(self.data_dir, engine), storage_engine=engine)
+            self.assertTrue(dm.add_records(records))
+            self.assertTrue(dm.update_record(2, {"date": "2024-06-01"}))
+            self.managers[engine] = dm
+
+    def tearDown(self):
+        for dm in self.managers.values():
+            dm.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def _assert_same(self, fn):
+        results = {engine: fn(dm) for engine, dm in self.managers.items()}
+        for engine in ENGINES[1:]:
+            self.assertEqual(results[engine], results["csv"], engine)
+
+    def test_engines_return_record_id_order(self):
+        self._assert_same(lambda dm: [i for i, _ in dm.get_all_records_with_ids()])
+        self._assert_same(lambda dm: [list(r) for r in dm.get_all_records()])
+        self._assert_same(lambda dm: [list(r) for r in dm.get_filtered_records({"user": "张"}, limit=4, offset=2)[0]])
+        self._assert_same(lambda dm: [i for i, _ in dm.iter_records({"date_start": "2024-04-01"}, with_ids=True)])
+
+
+if __name__ == "__main__":
+    unittest.main()
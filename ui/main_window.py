@@ -3,6 +3,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from core.utils import validate_date, format_timestamp, get_web_service_url
+from core.exporters import pyarrow_available
 
 class MainWindow:
     """主程序界面"""
@@ -442,8 +443,8 @@ class MainWindow:
     
             datetime.strptime(date_str, "%Y-%m-%d")
     
-            # 使用get_holiday_info获取详细信息
-            info = self.modules['holiday'].get_holiday_info(date_str)
+            # 使用get_holiday_info获取详细信息（只用到分类字段，不读取万年历）
+            info = self.modules['holiday'].get_holiday_info(date_str, almanac=False)
     
             # 打印详细信息
             print(f"\n{'='*60}")
@@ -672,7 +673,13 @@ class MainWindow:
             for widget in self.record_frame.winfo_children():
                 widget.destroy()
 
-            all_records, total_count = self.data_manager.get_filtered_records(self.current_filter)
+            # 只向数据层请求当前页
+            page_size = int(self.page_size_var.get())
+            if self.current_page < 1:
+                self.current_page = 1
+            start_idx = (self.current_page - 1) * page_size
+            page_records, total_count = self.data_manager.get_filtered_records(
+                self.current_filter, limit=page_size, offset=start_idx)
 
             if total_count == 0:
                 tk.Label(self.record_frame, text="暂无记录", font=("Arial", 10),
@@ -680,19 +687,17 @@ class MainWindow:
                 self.page_label.config(text="第 0/0 页")
                 return
 
-            page_size = int(self.page_size_var.get())
             self.total_pages = (total_count + page_size - 1) // page_size
 
             if self.current_page > self.total_pages:
+                # 页码超出（如删除记录或筛选条件变化后），取最后一页
                 self.current_page = self.total_pages
-            if self.current_page < 1:
-                self.current_page = 1
+                start_idx = (self.current_page - 1) * page_size
+                page_records, total_count = self.data_manager.get_filtered_records(
+                    self.current_filter, limit=page_size, offset=start_idx)
 
-            start_idx = (self.current_page - 1) * page_size
             end_idx = min(start_idx + page_size, total_count)
 
-            page_records = all_records[start_idx:end_idx]
-
             headers = ["日期", "用户", "类型", "工时", "请假类型", "请假时长", "工资", "提交时间"]
             for i, header in enumerate(headers):
                 tk.Label(self.record_frame, text=header, font=("Arial", 9, "bold"),
@@ -737,7 +742,12 @@ class MainWindow:
 
             # 工资统计
             if self.config_manager.get('overtime_pay.enabled', False):
-                total_salary, _ = self.modules['salary'].calculate_batch(self.data_manager.get_monthly_records(summary['month']))
+                table = self.data_manager.get_columnar()
+                if table is not None:
+                    month_records = table.select(month=summary['month'])
+                else:
+                    month_records = self.data_manager.iter_records({'month': summary['month']})
+                total_salary, _ = self.modules['salary'].calculate_batch(month_records, with_details=False)
                 if total_salary > 0:
                     hourly_wage = self.config_manager.get('overtime_pay.hourly_wage', 50.0)
                     tk.Label(base_frame, text=f"小时工资: {hourly_wage}元/小时",
@@ -782,7 +792,8 @@ class MainWindow:
         if self.is_leave.get():
             self.toggle_leave_options()
 
-        # 更新节假日信息
+        # 节假日数据源按新配置重新选择，再更新显示
+        self.modules['holiday'].reload()
         self.update_holiday_info()
 
         self.update_summary()
@@ -810,7 +821,10 @@ class MainWindow:
 
             result_msg = f"导入完成！\n\n成功: {imported} 条\n失败: {failed} 条"
             if errors:
-                result_msg += "\n\n前5个错误:\n" + "\n".join(errors)
+                result_msg += "\n\n前5个错误:\n" + "\n".join(errors[:5])
+                if len(errors) > 5:
+                    result_msg += f"\n...共 {len(errors)} 个错误"
+                    print("导入错误明细:\n" + "\n".join(errors))
 
             messagebox.showinfo("导入结果", result_msg)
 
@@ -823,45 +837,66 @@ class MainWindow:
         except Exception as e:
             messagebox.showerror("错误", f"导入失败: {str(e)}")
 
+    def _poll_export(self, save_path, state):
+        """刷新导出进度，导出结束后提示结果"""
+        if state['result'] is None:
+            if state['total']:
+                self.status_var.set(f"正在导出... {state['done']}/{state['total']}")
+            elif state['done']:
+                self.status_var.set(f"正在导出... 已写入 {state['done']} 条")
+            self.root.after(200, lambda: self._poll_export(save_path, state))
+            return
+
+        if state['result']:
+            self.status_var.set("导出完成")
+            if not save_path.lower().endswith(".xlsx"):
+                messagebox.showinfo("成功", f"文件已保存:\n{save_path}")
+            elif messagebox.askyesno("成功", f"Excel文件已保存:\n{save_path}\n\n是否立即打开？"):
+                import os
+                if os.name == 'nt':
+                    os.startfile(save_path)
+                else:
+                    os.system(f'open "{save_path}"')
+        else:
+            messagebox.showerror("错误",
+                "导出失败\n\n可能原因：\n"
+                "1. 未安装openpyxl（导出Excel需要，请在设置中安装）\n"
+                "2. 文件被其他程序占用\n"
+                "3. 没有数据可导出")
+            self.status_var.set("导出失败")
+
+        self.root.after(3000, lambda: self.status_var.set("就绪"))
+
     def export_to_excel(self):
         """导出到Excel"""
         try:
             import tkinter.filedialog as fd
+            filetypes = [("Excel文件", "*.xlsx"), ("gzip压缩CSV", "*.csv.gz"), ("JSON Lines", "*.ndjson")]
+            if pyarrow_available():
+                filetypes.append(("Parquet", "*.parquet"))
             save_path = fd.asksaveasfilename(
                 defaultextension=".xlsx",
-                filetypes=[("Excel文件", "*.xlsx")],
-                title="保存Excel文件",
+                filetypes=filetypes,
+                title="导出数据",
                 initialfile=f"加班记录_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             )
     
             if not save_path:
                 return
     
-            # 显示进度
-            self.status_var.set("正在导出Excel...")
-            self.root.update()
-    
-            # 调用导出
-            result = self.data_manager.export_excel(save_path)
-    
-            if result:
-                if messagebox.askyesno("成功", f"Excel文件已保存:\n{save_path}\n\n是否立即打开？"):
-                    import os
-                    if os.name == 'nt':
-                        os.startfile(save_path)
-                    else:
-                        os.system(f'open "{save_path}"')
-                self.status_var.set("导出完成")
-            else:
-                messagebox.showerror("错误",
-                    "导出失败\n\n可能原因：\n"
-                    "1. 未安装openpyxl（请在设置中安装）\n"
-                    "2. 文件被其他程序占用\n"
-                    "3. 没有数据可导出")
-                self.status_var.set("导出失败")
-    
-            self.root.after(3000, lambda: self.status_var.set("就绪"))
-    
+            # 后台线程导出（格式由扩展名决定），进度写入 state，由主线程定时读取刷新状态栏
+            self.status_var.set("正在导出...")
+            state = {'done': 0, 'total': 0, 'result': None}
+
+            def on_progress(done, total):
+                state['done'], state['total'] = done, total
+
+            def on_done(result):
+                state['result'] = result
+
+            self.data_manager.export_async(save_path, progress=on_progress, on_done=on_done)
+            self.root.after(200, lambda: self._poll_export(save_path, state))
+
         except Exception as e:
             messagebox.showerror("错误", f"导出失败: {str(e)}")
             self.status_var.set("导出异常")
@@ -891,6 +926,10 @@ class MainWindow:
             tk.Button(btn_frame, text="🔍筛选", command=self.open_filter_dialog,
                      bg="#FF9800", fg="white", width=10).pack(side='left', padx=3)
 
+            more_btn = tk.Button(btn_frame, text="⬇ 加载更多", command=lambda: load_more(),
+                                 width=10, state='disabled')
+            more_btn.pack(side='left', padx=3)
+
             tk.Button(btn_frame, text="✖ 关闭", command=top.destroy,
                      bg="#E0E0E0", width=10).pack(side='right', padx=3)
 
@@ -905,11 +944,21 @@ class MainWindow:
             scrollbar_x = tk.Scrollbar(table_frame, orient=tk.HORIZONTAL)
             scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
 
+            # 分页加载状态：每次按游标读取一页，滚动到底部时自动加载下一页
+            page_size = 500
+            state = {'cursor': None, 'loaded': 0, 'loading': False}
+
+            def on_scroll(first, last):
+                scrollbar_y.set(first, last)
+                if float(last) >= 0.999 and state['cursor'] and not state['loading']:
+                    state['loading'] = True
+                    top.after_idle(load_more)
+
             # 表格控件
             tree = ttk.Treeview(table_frame,
                                columns=('日期', '用户', '类型', '工作时长', '请假类型', '请假时长', '提交时间', '工资'),
                                show='headings',
-                               yscrollcommand=scrollbar_y.set,
+                               yscrollcommand=on_scroll,
                                xscrollcommand=scrollbar_x.set)
 
             scrollbar_y.config(command=tree.yview)
@@ -932,21 +981,33 @@ class MainWindow:
                 # 清空现有数据
                 for item in tree.get_children():
                     tree.delete(item)
+                state['cursor'] = None
+                state['loaded'] = 0
+                load_more()
 
-                # 获取数据
-                records, total = self.data_manager.get_all_records_with_total()
+            def load_more():
+                # 按游标读取下一页（带记录ID，用于删除）
+                try:
+                    items, next_cursor = self.data_manager.page(cursor=state['cursor'], page_size=page_size)
+                finally:
+                    state['loading'] = False
 
-                if not records:
+                if not items and state['loaded'] == 0:
                     tree.insert('', 'end', values=('暂无数据', '', '', '', '', '', '', ''))
+                    more_btn.config(state='disabled')
                     return
 
-                # 插入数据
-                for record in records:
-                    tree.insert('', 'end', values=record[:8])
+                # 插入数据，以记录ID作为行标识
+                for record_id, record in items:
+                    tree.insert('', 'end', iid=str(record_id), values=record[:8])
+                state['cursor'] = next_cursor
+                state['loaded'] += len(items)
+                more_btn.config(state='normal' if next_cursor else 'disabled')
 
-                # 更新状态
+                # 更新状态（总数取自索引，不读取全部记录）
                 if hasattr(self, 'status_var'):
-                    self.status_var.set(f"共 {total} 条记录")
+                    _, total = self.data_manager.get_filtered_records({}, limit=0)
+                    self.status_var.set(f"共 {total} 条记录，已加载 {state['loaded']} 条")
 
             #右键菜单
             def popup_menu(event):
@@ -967,12 +1028,15 @@ class MainWindow:
 
             def delete_record():
                 selected = tree.selection()
-                if selected and messagebox.askyesno("确认", "确定要删除这条记录吗？"):
-                    item = tree.item(selected[0])
-                    values = item['values']
-                    # 调用删除逻辑（需要在data_manager中添加）
-                    tree.delete(selected[0])
-                    messagebox.showinfo("成功", "记录已删除")
+                if selected and selected[0].isdigit() and messagebox.askyesno("确认", "确定要删除这条记录吗？"):
+                    if self.data_manager.delete_record(int(selected[0])):
+                        tree.delete(selected[0])
+                        messagebox.showinfo("成功", "记录已删除")
+                        self.refresh_records()
+                        self.update_summary()
+                    else:
+                        messagebox.showerror("失败", "删除失败，记录可能已被删除")
+                        load_data(True)
 
             tree.bind('<Button-3>', popup_menu)
             tree.bind('<Double-1>', lambda e: show_detail())